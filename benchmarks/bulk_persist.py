@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare inserting rows through the ORM with ``add_all`` against
+:any:`BulkSession.bulk_persist` with mapped objects and with dicts.
+
+Usage::
+
+    python benchmarks/bulk_persist.py [--rows 50000] [--url sqlite:///bench.db]
+
+Without ``--url`` it runs against a SQLite file in a temp dir. The table
+``bulk_persist_bench`` is created for the run, emptied before each method, and
+dropped at the end.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table
+
+from sql_connectors.client import SqlClient
+
+TABLE = "bulk_persist_bench"
+
+
+def make_rows(count):
+    return [
+        {"id": i, "name": "row {}".format(i), "value": i * 0.5} for i in range(count)
+    ]
+
+
+def create_table(client):
+    table = Table(
+        TABLE,
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("name", String(50)),
+        Column("value", Float),
+    )
+    table.drop(bind=client, checkfirst=True)
+    table.create(bind=client)
+    return client.table_factory(TABLE)
+
+
+def orm_add_all(client, model, rows, batch_size):
+    session = client.create_session()
+    for start in range(0, len(rows), batch_size):
+        session.add_all(model(**row) for row in rows[start : start + batch_size])
+        session.flush()
+    session.commit()
+    session.close()
+
+
+def bulk_objects(client, model, rows, batch_size):
+    session = client.create_session()
+    session.bulk_persist((model(**row) for row in rows), batch_size=batch_size)
+    session.commit()
+    session.close()
+
+
+def bulk_dicts(client, model, rows, batch_size):
+    session = client.create_session()
+    session.bulk_persist(rows, mapper=model, batch_size=batch_size)
+    session.commit()
+    session.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50000, help="rows to insert")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per batch")
+    parser.add_argument("--url", default=None, help="database to run against")
+    options = parser.parse_args(args)
+
+    directory = None
+    url = options.url
+    if url is None:
+        directory = tempfile.mkdtemp(prefix="sql_connectors_bench_")
+        url = "sqlite:///" + os.path.join(directory, "bench.db")
+
+    try:
+        client = SqlClient(url)
+        model = create_table(client)
+        rows = make_rows(options.rows)
+        print("{:<14} {:>10} {:>12}".format("method", "seconds", "rows/s"))
+        for name, method in [
+            ("orm add_all", orm_add_all),
+            ("bulk objects", bulk_objects),
+            ("bulk dicts", bulk_dicts),
+        ]:
+            client.execute(model.__table__.delete())
+            start = time.time()
+            method(client, model, rows, options.batch_size)
+            seconds = time.time() - start
+
+            count = client.execute("select count(*) from {}".format(TABLE)).scalar()
+            assert count == len(rows), "{} wrote {} rows".format(name, count)
+            print(
+                "{:<14} {:>10.2f} {:>12,.0f}".format(name, seconds, len(rows) / seconds)
+            )
+
+        model.__table__.drop(bind=client)
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -82,8 +82,6 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
-        "Programming Language :: Python :: 2",
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
@@ -92,15 +90,22 @@ setup(
     description="A simple wrapper for SQL connections using SQLAlchemy and Pandas read_sql to standardize SQL workflow.",
     install_requires=install_requires,
     extras_require={
-        'dev': dev_requires
+        'dev': dev_requires,
+        'parquet': ['pyarrow'],
     },
     dependency_links=dependency_links,
+    entry_points={
+        'console_scripts': [
+            'sql-connectors-slowlog=sql_connectors.slowlog:main',
+        ],
+    },
     license="MIT license",
     long_description=long_description,
     include_package_data=True,
     keywords='sql_connectors',
     name='sql_connectors',
     packages=find_packages(include=['sql_connectors']),
+    python_requires='>=3.4',
     url='https://github.com/aiguofer/sql_connectors',
     setup_requires=['pytest-runner'],
     tests_require=['pytest'],
@@ -2,5 +2,6 @@
 
 from ._version import __version__, __version_info__
 from .storage import LocalStorage
+from .transfer import copy_table
 
-__all__ = ["__version__", "__version_info__", "LocalStorage"]
+__all__ = ["__version__", "__version_info__", "LocalStorage", "copy_table"]
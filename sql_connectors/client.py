@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import threading
 from builtins import str, super
 from contextlib import contextmanager
 
@@ -9,10 +10,21 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .export import export_parquet
+from .execution import QueryGuard, QueryHandle, guard_connection
+from .orm import BulkSession
+from .pagination import KeysetIterator
+from .profiling import profile_table
+from .routing import ReplicaRouter
+from .slowlog import SlowQueryLog
+from .spill import spill_to_disk
 from .util import extend_docs
 
 __all__ = ["SqlClient"]
 
+#: Rows per spilled file when :any:`SqlClient.read_sql` is called with ``spill=True``
+SPILL_CHUNKSIZE = 100000
+
 
 class SqlClient(Engine):
     """This is a convenience wrapper around :class:`sqlalchemy.engine.Engine`.
@@ -32,7 +44,17 @@ class SqlClient(Engine):
     """
 
     @extend_docs(create_engine)
-    def __init__(self, url, default_schema=None, reflect=False, **kwargs):
+    def __init__(
+        self,
+        url,
+        default_schema=None,
+        reflect=False,
+        statement_timeout=None,
+        replicas=None,
+        routing="round_robin",
+        health_check_interval=30,
+        **kwargs
+    ):
         """Instanciate a :class:`SqlClient` with the given params.
 
         :param str url: Url to connect
@@ -41,6 +63,14 @@ class SqlClient(Engine):
              (Default value = None)
         :param bool reflect: Whether to try to reflect the
              :class:`sqlalchemy.schema.MetaData` (Default value = False)
+        :param float statement_timeout: Default timeout in seconds for queries run
+             through :any:`read_sql` and :any:`read_sql_async` (Default value = None)
+        :param list replicas: Urls of read replicas used by :any:`read_sql`,
+             :any:`read_sql_async` and :any:`read_session` (Default value = None)
+        :param str routing: How to pick a replica, see :any:`ReplicaRouter`
+             (Default value = 'round_robin')
+        :param float health_check_interval: Seconds between replica health checks
+             (Default value = 30)
 
         See :any:`sqlalchemy.create_engine` for ``**kwargs``:
         """
@@ -67,9 +97,46 @@ class SqlClient(Engine):
 
         self.default_schema = default_schema
 
+        # classes built by table_factory, keyed by (schema, name, primary key)
+        self._declarative_base = declarative_base(metadata=self.metadata)
+        self._mapped_classes = {}
+        self._mapped_classes_lock = threading.Lock()
+
+        #: Default timeout in seconds for :any:`read_sql` and :any:`read_sql_async`.
+        #: ``None`` means queries can run forever
+        self.statement_timeout = statement_timeout
+
+        #: Name of the connection config this client was created from, if any
+        self.connection_name = None
+
+        #: Name of the env this client was created from, if any
+        self.env = None
+
+        #: Instance of :any:`SlowQueryLog` set up by :any:`log_slow_queries`, if any
+        self.slow_query_log = None
+
+        #: Instance of :any:`ReplicaRouter` that spreads reads over the replicas, or
+        #: ``None`` if there are no replicas and everything goes to ``self``
+        self.router = None
+        if replicas:
+            self.router = ReplicaRouter(
+                self,
+                [create_engine(replica, **kwargs) for replica in replicas],
+                routing,
+                health_check_interval,
+            )
+
     def __repr__(self):
         return super().__repr__().replace("Engine", "SqlClient")
 
+    def dispose(self, close=True):
+        """Dispose of the connection pool, along with the replicas' pools and their
+        health checks. See :meth:`sqlalchemy.engine.Engine.dispose`.
+        """
+        if self.router is not None:
+            self.router.close()
+        super().dispose(close)
+
     def __getitem__(self, key):
         """Return the given table"""
         if key in self.metadata.tables:
@@ -118,43 +185,194 @@ class SqlClient(Engine):
         be used for ORM like operations. Usually, :any:`get_table` will be
         enough.
 
+        Classes are cached, so calling this again for the same table and primary
+        key returns the same class. They all share one declarative base, so the
+        class is named after the table unless another class already has that name
+        (the same table with a different primary key, or a table with the same name
+        in another schema), in which case the schema and primary key are added to
+        its name, like ``schema__table__id``.
+
         :param str name: Name of the table, can include schema name with dot notation
         :param str schema: Explicitly give schema name (Default value = None)
         :param str primarykey: Column name for primary key (Default value = None)
 
         """
-        tbl = self.get_table(name, schema=schema)
-        bases = (declarative_base(),)
-        attrs = {"__table__": tbl, "__mapper_args__": {}}
-        if primarykey:
-            attrs["__mapper_args__"]["primary_key"] = [
-                getattr(tbl.c, x) for x in primarykey
-            ]
-        return type(name, bases, attrs)
+        name, schema = _parse_table_name(name, schema or self.default_schema)
+        key = (schema, name, tuple(primarykey or ()))
+
+        with self._mapped_classes_lock:
+            if key not in self._mapped_classes:
+                tbl = self.get_table(name, schema=schema)
+                bases = (self._declarative_base,)
+                attrs = {"__table__": tbl, "__mapper_args__": {}}
+                if primarykey:
+                    attrs["__mapper_args__"]["primary_key"] = [
+                        getattr(tbl.c, x) for x in primarykey
+                    ]
+                taken = set(cls.__name__ for cls in self._mapped_classes.values())
+                class_name = name if name not in taken else _class_name(*key)
+                self._mapped_classes[key] = type(class_name, bases, attrs)
+            return self._mapped_classes[key]
 
     @extend_docs(pd.read_sql, True)
-    def read_sql(self, sql, **kwargs):
+    def read_sql(self, sql, timeout=None, spill=False, spill_dir=None, **kwargs):
         """This is a wrapper around :any:`pandas.read_sql` using the current ``Engine``
         as con.
 
+        If a ``timeout`` (or a default :any:`statement_timeout`) is set, the query is
+        aborted once it runs for longer than that and :any:`QueryTimeout` is raised.
+
+        For results that don't fit in memory, ``spill=True`` streams them in chunks
+        (of ``chunksize`` rows, 100000 by default) to Arrow files in a scratch
+        directory and returns a lazy :any:`SpilledFrame` instead of a ``DataFrame``.
+
+        :param float timeout: Seconds the query is allowed to run for, overrides
+             :any:`statement_timeout` (Default value = None)
+        :param bool spill: Whether to spill the results to disk (Default value = False)
+        :param str spill_dir: Where to create the scratch directory for spilled
+             results (Default value = None, the system temp dir)
+
+        Docstring for :any:`pandas.read_sql`:
+        """
+        timeout = self.statement_timeout if timeout is None else timeout
+        guard = QueryGuard(timeout) if timeout else None
+
+        if spill:
+            kwargs["chunksize"] = kwargs.get("chunksize") or SPILL_CHUNKSIZE
+            return spill_to_disk(
+                self._iter_sql(sql, guard, **kwargs), spill_dir, sql=sql
+            )
+
+        if kwargs.get("chunksize"):
+            return self._iter_sql(sql, guard, **kwargs)
+
+        with self._read_connection(guard) as conn:
+            return self._read_frame(sql, conn, **kwargs)
+
+    def _read_frame(self, sql, conn, **kwargs):
+        """Run :any:`pandas.read_sql` on ``conn``, timing it for the slow query log
+        if there is one.
+        """
+        if self.slow_query_log is None:
+            return pd.read_sql(sql, con=conn, **kwargs)
+        with self.slow_query_log.measure():
+            return pd.read_sql(sql, con=conn, **kwargs)
+
+    def _iter_sql(self, sql, guard, **kwargs):
+        """Generator version of :any:`read_sql` that holds on to its connection
+        until all the chunks have been read. The timeout of ``guard`` doesn't count
+        the time the caller spends on each chunk.
+
+        Results are streamed with a server side cursor where the driver supports
+        it, so only one chunk is ever in memory.
+        """
+        with self._read_connection(guard) as conn:
+            conn = conn.execution_options(stream_results=True)
+            for chunk in pd.read_sql(sql, con=conn, **kwargs):
+                if guard is not None:
+                    guard.pause()
+                try:
+                    yield chunk
+                finally:
+                    if guard is not None:
+                        guard.resume()
+
+    @contextmanager
+    def _read_connection(self, guard=None):
+        """Yield a connection for reads, with the timeout of ``guard`` applied. It
+        goes to a replica if there are any healthy ones, otherwise to ``self``.
+
+        :param QueryGuard guard: Timeout and cancellation state (Default value = None)
+        """
+        connect = self.connect if self.router is None else self.router.connect
+        with connect() as conn:
+            if guard is None:
+                yield conn
+            else:
+                with guard_connection(conn, guard):
+                    yield conn
+
+    @extend_docs(pd.read_sql, True)
+    def read_sql_async(self, sql, timeout=None, **kwargs):
+        """Run :any:`read_sql` in a background thread and return a
+        :any:`QueryHandle` right away. The handle can be used to wait for the
+        resulting ``DataFrame`` or to cancel the query, which frees its connection.
+
+        :param float timeout: Seconds the query is allowed to run for, overrides
+             :any:`statement_timeout` (Default value = None)
+
         Docstring for :any:`pandas.read_sql`:
         """
-        return pd.read_sql(sql, con=self, **kwargs)
+        if kwargs.get("chunksize"):
+            raise ValueError("chunksize is not supported by read_sql_async")
+
+        timeout = self.statement_timeout if timeout is None else timeout
+        return QueryHandle(
+            self._read_connection,
+            lambda conn: self._read_frame(sql, conn, **kwargs),
+            timeout or None,
+        )
+
+    @extend_docs(SlowQueryLog.__init__)
+    def log_slow_queries(self, threshold, **kwargs):
+        """Start logging queries that take longer than ``threshold`` seconds, along
+        with their plan. Returns the :any:`SlowQueryLog`, which is also kept as
+        :any:`slow_query_log`.
+
+        See :any:`SlowQueryLog.__init__` for params:
+        """
+        if self.slow_query_log is not None:
+            self.slow_query_log.close()
+        self.slow_query_log = SlowQueryLog(self, threshold, **kwargs)
+        return self.slow_query_log
+
+    @extend_docs(export_parquet)
+    def export_parquet(self, table_or_sql, path, **kwargs):
+        """This is a wrapper around :any:`sql_connectors.export.export_parquet` using
+        the current ``Engine`` as client.
+
+        Docstring for :any:`sql_connectors.export.export_parquet`:
+        """
+        return export_parquet(self, table_or_sql, path, **kwargs)
+
+    @extend_docs(KeysetIterator.__init__)
+    def iter_table(self, table, **kwargs):
+        """Iterate over a table in pages using keyset pagination. Returns a
+        :any:`KeysetIterator`, see it for details.
+
+        See :any:`KeysetIterator.__init__` for params:
+        """
+        return KeysetIterator(self, table, **kwargs)
+
+    @extend_docs(profile_table)
+    def profile(self, table, **kwargs):
+        """This is a wrapper around :any:`sql_connectors.profiling.profile_table`
+        using the current ``Engine`` as client.
+
+        Docstring for :any:`sql_connectors.profiling.profile_table`:
+        """
+        return profile_table(self, table, **kwargs)
 
     @extend_docs(sessionmaker)
     def create_session(self, **kwargs):
         """This is a wrapper around :any:`sqlalchemy.orm.session.sessionmaker` using
-        current ``Engine`` as bind.
+        current ``Engine`` as bind. This always uses the primary, so it's the one to
+        use for writes. Sessions are :any:`BulkSession` instances unless another
+        ``class_`` is given.
 
         Docstring for :any:`sqlalchemy.orm.session.sessionmaker`:
         """
+        kwargs.setdefault("class_", BulkSession)
         return sessionmaker(bind=self, **kwargs)()
 
     @contextmanager
     @extend_docs(sessionmaker)
     def read_session(self, **kwargs):
         """This is a wrapper around :any:`sqlalchemy.orm.session.sessionmaker` using
-        current ``Engine`` as bind and used as a contextmanager.
+        current ``Engine`` as bind and used as a contextmanager. If there are read
+        replicas, the session is bound to one of them instead, so it should only be
+        used for reads. Use :any:`create_session` to write, including with
+        :any:`BulkSession.bulk_persist`.
 
         For example::
 
@@ -163,11 +381,24 @@ class SqlClient(Engine):
 
         Docstring for :any:`sqlalchemy.orm.session.sessionmaker`:
         """
-        session = self.create_session(**kwargs)
-        try:
-            yield session
-        finally:
-            session.close()
+        with self._read_connection() as conn:
+            session = sessionmaker(bind=conn, **kwargs)()
+            try:
+                yield session
+            finally:
+                session.close()
+
+
+def _class_name(schema, name, primarykey):
+    """Name for a class built by :any:`SqlClient.table_factory` when the table
+    name is already taken. All the classes share one declarative base, so the name
+    includes the schema and primary key to keep it unique.
+
+    :param str schema: Name of the schema, or None
+    :param str name: Name of the table
+    :param tuple primarykey: Column names of the primary key, if given
+    """
+    return "__".join(part for part in [schema, name, "_".join(primarykey)] if part)
 
 
 def _parse_table_name(table_name, schema=None):
@@ -5,3 +5,9 @@ class SQLConnectorException(Exception):
 
 class ConfigurationException(SQLConnectorException):
     """Exception while reading the configuration"""
+
+class QueryTimeout(SQLConnectorException):
+    """Exception when a query exceeds its statement timeout"""
+
+class QueryCancelled(SQLConnectorException):
+    """Exception when a query was cancelled by the caller"""
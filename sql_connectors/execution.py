@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from contextlib import contextmanager
+
+from .exceptions import QueryCancelled, QueryTimeout, SQLConnectorException
+
+__all__ = ["QueryGuard", "QueryHandle", "guard_connection", "cancel_connection"]
+
+#: Number of SQLite virtual machine instructions between progress handler calls
+SQLITE_PROGRESS_STEPS = 1000
+
+#: Seconds between checks of a paused query by the timer fallback
+WATCHDOG_POLL_INTERVAL = 0.1
+
+
+class QueryGuard(object):
+    """Deadline and cancellation state shared between a running query and
+    whoever may want to stop it.
+
+    Only the time the query is actually running counts towards the timeout.
+    Chunked reads :any:`pause` the clock while the caller holds a chunk, the same
+    way server side timeouts only count time spent on the server.
+    """
+
+    def __init__(self, timeout=None):
+        """
+        :param float timeout: Seconds the query is allowed to run for
+             (Default value = None)
+        """
+        self.timeout = timeout
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._spent = 0.0
+        self._started = time.time()
+
+    def cancel(self):
+        """Flag the query as cancelled"""
+        self.cancel_event.set()
+
+    def pause(self):
+        """Stop counting time towards the timeout"""
+        with self._lock:
+            if self._started is not None:
+                self._spent += time.time() - self._started
+                self._started = None
+
+    def resume(self):
+        """Start counting time towards the timeout again"""
+        with self._lock:
+            if self._started is None:
+                self._started = time.time()
+
+    @property
+    def paused(self):
+        """Whether time is currently not counted towards the timeout"""
+        with self._lock:
+            return self._started is None
+
+    @property
+    def elapsed(self):
+        """Seconds the query has been running for, not counting pauses"""
+        with self._lock:
+            if self._started is None:
+                return self._spent
+            return self._spent + time.time() - self._started
+
+    @property
+    def remaining(self):
+        """Seconds left before the timeout, or ``None`` if there's no timeout"""
+        if not self.timeout:
+            return None
+        return max(self.timeout - self.elapsed, 0.0)
+
+    @property
+    def cancelled(self):
+        """Whether the query has been cancelled"""
+        return self.cancel_event.is_set()
+
+    @property
+    def expired(self):
+        """Whether the query has used up its timeout"""
+        return bool(self.timeout) and self.elapsed >= self.timeout
+
+    def should_abort(self):
+        """Whether the query should stop as soon as possible"""
+        return self.cancelled or self.expired
+
+
+@contextmanager
+def guard_connection(conn, guard):
+    """Apply the timeout of ``guard`` to ``conn`` using the dialect-native
+    mechanism, and translate the errors the driver raises when a query is
+    interrupted into :any:`QueryTimeout` or :any:`QueryCancelled`.
+
+    Postgres uses ``statement_timeout``, MySQL uses ``MAX_EXECUTION_TIME`` and
+    SQLite uses a progress handler that interrupts the running statement. Any
+    other dialect falls back to cancelling the query from a timer thread.
+
+    :param conn: A :class:`sqlalchemy.engine.Connection`
+    :param QueryGuard guard: Holds the timeout and cancellation state
+    """
+    dialect = conn.dialect.name
+    dbapi_conn = conn.connection.connection
+    timer = None
+    reset = None
+
+    if dialect == "sqlite":
+        # the handler is also how SQLite notices a cancellation, so install it
+        # even if there's no timeout
+        dbapi_conn.set_progress_handler(
+            lambda: int(guard.should_abort()), SQLITE_PROGRESS_STEPS
+        )
+
+        def reset_progress_handler():
+            dbapi_conn.set_progress_handler(None, SQLITE_PROGRESS_STEPS)
+
+        reset = reset_progress_handler
+
+    elif guard.timeout:
+        millis = int(guard.timeout * 1000)
+        if dialect == "postgresql":
+            conn.execute("SET statement_timeout = {}".format(millis))
+
+            def reset_statement_timeout():
+                conn.execute("RESET statement_timeout")
+
+            reset = reset_statement_timeout
+
+        elif dialect == "mysql":
+            conn.execute("SET SESSION MAX_EXECUTION_TIME = {}".format(millis))
+
+            def reset_max_execution_time():
+                conn.execute("SET SESSION MAX_EXECUTION_TIME = DEFAULT")
+
+            reset = reset_max_execution_time
+
+        else:
+            timer = _Watchdog(guard, conn)
+            timer.start()
+
+    try:
+        yield conn
+    except Exception:
+        if guard.cancelled:
+            raise QueryCancelled("Query was cancelled")
+        if guard.expired:
+            raise QueryTimeout(
+                "Query exceeded timeout of {} seconds".format(guard.timeout)
+            )
+        raise
+    finally:
+        if timer is not None:
+            timer.stop()
+        if reset is not None:
+            try:
+                reset()
+            except Exception:
+                # never hand a connection with a leftover timeout back to the pool
+                conn.invalidate()
+
+
+def cancel_connection(conn):
+    """Abort the statement currently running on ``conn``. This is meant to be
+    called from a different thread than the one running the query.
+
+    :param conn: A :class:`sqlalchemy.engine.Connection`
+    """
+    dbapi_conn = conn.connection.connection
+    if conn.dialect.name == "mysql":
+        # MySQL drivers can't cancel in-band, kill it from another connection
+        conn.engine.execute("KILL QUERY {}".format(dbapi_conn.thread_id()))
+    elif hasattr(dbapi_conn, "cancel"):
+        dbapi_conn.cancel()
+    elif hasattr(dbapi_conn, "interrupt"):
+        dbapi_conn.interrupt()
+
+
+class _Watchdog(threading.Thread):
+    """Cancel the query on a connection once its guard expires, for dialects
+    without a native timeout. Pauses of the guard push the deadline back.
+    """
+
+    def __init__(self, guard, conn):
+        super(_Watchdog, self).__init__()
+        self.daemon = True
+        self._guard = guard
+        self._conn = conn
+        self._stopped = threading.Event()
+
+    def run(self):
+        while True:
+            # while paused the remaining time doesn't go down, so check back
+            # regularly instead of waking up right away over and over
+            if self._guard.paused:
+                wait = WATCHDOG_POLL_INTERVAL
+            else:
+                wait = self._guard.remaining
+            if self._stopped.wait(wait):
+                return
+            if self._guard.expired:
+                cancel_connection(self._conn)
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+
+class QueryHandle(object):
+    """Handle for a query running in a background thread. This is returned by
+    :any:`SqlClient.read_sql_async` and lets the caller wait for the result or
+    cancel the query.
+
+    For example::
+
+        handle = SqlClientInstance.read_sql_async('select ...', timeout=60)
+        ... do other things
+        if taking_too_long:
+            handle.cancel()
+        else:
+            df = handle.result()
+    """
+
+    def __init__(self, connect, func, timeout=None):
+        """
+        :param connect: Function returning a context manager that yields the
+             connection to run the query on
+        :param func: Function that takes a connection and returns the result
+        :param float timeout: Seconds the query is allowed to run for
+             (Default value = None)
+        """
+        self._connect = connect
+        self._func = func
+        self._guard = QueryGuard(timeout)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._result = None
+        self._error = None
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with self._connect() as conn:
+                with self._lock:
+                    self._conn = conn
+                try:
+                    with guard_connection(conn, self._guard):
+                        if self._guard.cancelled:
+                            raise QueryCancelled("Query was cancelled")
+                        result = self._func(conn)
+                    if self._guard.cancelled:
+                        raise QueryCancelled("Query was cancelled")
+                    self._result = result
+                except QueryCancelled:
+                    # drop the connection rather than return a half-read cursor
+                    conn.invalidate()
+                    raise
+                finally:
+                    with self._lock:
+                        self._conn = None
+        except Exception as e:
+            self._error = e
+
+    def cancel(self, wait=True):
+        """Cancel the query and release its connection
+
+        :param bool wait: Whether to block until the query has stopped
+             (Default value = True)
+        """
+        self._guard.cancel()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    cancel_connection(self._conn)
+                except Exception:
+                    # the guard will still stop it at the next checkpoint
+                    pass
+        if wait:
+            self._thread.join()
+
+    def cancelled(self):
+        """Whether the query has been cancelled"""
+        return self._guard.cancelled
+
+    def done(self):
+        """Whether the query has finished, failed, or been cancelled"""
+        return not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        """Wait for the query to finish and return its result. Re-raises any
+        error from the query, including :any:`QueryTimeout` and
+        :any:`QueryCancelled`.
+
+        :param float timeout: Seconds to wait for the result (Default value = None)
+        """
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise SQLConnectorException(
+                "Query did not finish within {} seconds".format(timeout)
+            )
+        if self._error is not None:
+            raise self._error
+        return self._result
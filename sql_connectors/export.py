@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import datetime
+import decimal
+import itertools
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+from six import string_types
+from six.moves.urllib.parse import quote
+from sqlalchemy import Table
+
+from .exceptions import SQLConnectorException
+
+__all__ = ["export_parquet"]
+
+#: Name of the manifest file written at the root of each exported dataset
+MANIFEST_NAME = "_manifest.json"
+
+#: Directory name used for null partition values, same as Hive
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def export_parquet(
+    client,
+    table_or_sql,
+    path,
+    partition_by=None,
+    chunk_rows=100000,
+    row_group_size=None,
+    compression="snappy",
+    max_workers=4,
+    overwrite=False,
+    timeout=None,
+    rows_per_file=None,
+):
+    """Export a table or query to a Parquet dataset without holding the whole
+    result in memory.
+
+    Results are fetched ``chunk_rows`` at a time while a thread pool converts and
+    compresses the previous chunks, so fetching overlaps with writing. Every
+    partition gets a single file, laid out as ``path/col=value/part-00000.parquet``
+    when ``partition_by`` is given, which stays open for the whole export and gets
+    a row group each time ``row_group_size`` rows have piled up for it. Rows end
+    up in the files in the order the query returned them. A ``_manifest.json``
+    with the row count of every file is written last and can be used to verify
+    the export.
+
+    Different files are written in parallel, but each file is written by one
+    thread at a time. Setting ``rows_per_file`` splits large partitions (or an
+    unpartitioned export) into numbered files so they can be compressed in
+    parallel too.
+
+    All files share one schema. It comes from the column types when exporting a
+    table or a SQLAlchemy query, and is otherwise inferred from the data, holding
+    back the first few chunks until every column has had a value.
+
+    Returns the manifest as a dict.
+
+    :param SqlClient client: Client to read from
+    :param table_or_sql: A table name (can include schema name with dot notation),
+         a :class:`sqlalchemy.schema.Table`, or a query
+    :param str path: Directory for the dataset
+    :param list partition_by: Column names to partition by (Default value = None)
+    :param int chunk_rows: Number of rows to fetch at a time (Default value = 100000)
+    :param int row_group_size: Number of rows per row group, each partition keeps up
+         to this many rows in memory (Default value = None, ``chunk_rows``)
+    :param str compression: Parquet compression codec (Default value = 'snappy')
+    :param int max_workers: Number of writer threads (Default value = 4)
+    :param bool overwrite: Whether to delete ``path`` first if it already has files
+         (Default value = False)
+    :param float timeout: Seconds the query is allowed to run for
+         (Default value = None)
+    :param int rows_per_file: Start a new file every this many rows fetched,
+         rounded up to whole chunks (Default value = None, one file per partition)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise SQLConnectorException(
+            "pyarrow is required to export parquet, install sql_connectors[parquet]"
+        )
+
+    path = os.path.expanduser(path)
+    if os.path.exists(path) and os.listdir(path):
+        if not overwrite:
+            raise SQLConnectorException("{} already exists".format(path))
+        shutil.rmtree(path)
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    sql = _get_query(client, table_or_sql)
+    partition_by = list(partition_by or [])
+    row_group_size = row_group_size or chunk_rows
+    max_pending = max_workers * 2
+
+    chunks = iter(client.read_sql(sql, chunksize=chunk_rows, timeout=timeout))
+    schema, held_back, stringified = _resolve_schema(
+        _column_types(sql), chunks, partition_by, max_pending
+    )
+
+    partitions = {}
+
+    def get_partition(values, number):
+        """Return the writer for a partition and file number, in the main thread"""
+        key = (values, number)
+        if key not in partitions:
+            sub_path = os.path.join(
+                *[_partition_dir(c, v) for c, v in zip(partition_by, values)]
+                + ["part-{:05d}.parquet".format(number)]
+            )
+            partitions[key] = _PartitionWriter(
+                path, sub_path, schema, row_group_size, compression
+            )
+        return partitions[key]
+
+    def convert(chunk):
+        """Split a chunk by partition and convert each part to Arrow"""
+        if partition_by:
+            keys = partition_by if len(partition_by) > 1 else partition_by[0]
+            groups = chunk.groupby(keys, sort=False, dropna=False)
+        else:
+            groups = [((), chunk)]
+
+        tables = []
+        for values, group in groups:
+            if not isinstance(values, tuple):
+                values = (values,)
+            table = pa.Table.from_pandas(
+                _stringify(group.drop(columns=partition_by), stringified),
+                schema=schema,
+                preserve_index=False,
+            )
+            tables.append((values, table))
+        return tables
+
+    # chunks are converted in any order, but handed to their writers in the order
+    # they were fetched, which then write them in that order
+    converting = collections.deque()
+    writing = set()
+
+    def dispatch():
+        """Hand the oldest converted chunk to the writers of its partitions"""
+        number, future = converting.popleft()
+        file_number = number * chunk_rows // rows_per_file if rows_per_file else 0
+        for values, table in future.result():
+            writer = get_partition(values, file_number)
+            writing.add(executor.submit(writer.write, writer.reserve(), table))
+
+    def reap(block):
+        """Raise errors from finished writes, waiting for one if ``block``"""
+        if block:
+            wait(writing, return_when=FIRST_COMPLETED)
+        for future in [f for f in writing if f.done()]:
+            writing.discard(future)
+            future.result()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for number, chunk in enumerate(itertools.chain(held_back, chunks)):
+                converting.append((number, executor.submit(convert, chunk)))
+                while converting and converting[0][1].done():
+                    dispatch()
+                reap(False)
+
+                # don't let fetching get too far ahead of writing
+                while len(converting) + len(writing) >= max_pending:
+                    if converting:
+                        dispatch()
+                    else:
+                        reap(True)
+
+            while converting:
+                dispatch()
+            while writing:
+                reap(True)
+    finally:
+        files = [writer.close() for writer in partitions.values()]
+
+    manifest = {
+        "query": str(sql),
+        "partition_by": partition_by,
+        "compression": compression,
+        "rows": sum(f["rows"] for f in files),
+        "files": sorted(files, key=lambda f: f["path"]),
+    }
+    with open(os.path.join(path, MANIFEST_NAME), "w") as writer:
+        json.dump(manifest, writer, indent=2)
+    return manifest
+
+
+class _PartitionWriter(object):
+    """Parquet file for one partition that stays open across chunks and writes a
+    row group each time ``row_group_size`` rows have been buffered.
+
+    Tables can be written from several threads: each one first takes a ticket
+    with :any:`reserve`, in the order they should end up in the file, and
+    :any:`write` waits for its turn.
+    """
+
+    def __init__(self, root, sub_path, schema, row_group_size, compression):
+        import pyarrow.parquet as pq
+
+        full_path = os.path.join(root, sub_path)
+        if not os.path.exists(os.path.dirname(full_path)):
+            os.makedirs(os.path.dirname(full_path))
+
+        self.sub_path = sub_path
+        self.rows = 0
+        self._row_group_size = row_group_size
+        self._buffer = []
+        self._buffered = 0
+        self._issued = 0
+        self._turn = 0
+        self._turn_changed = threading.Condition()
+        self._writer = pq.ParquetWriter(full_path, schema, compression=compression)
+
+    def reserve(self):
+        """Return the ticket for the next table to write"""
+        ticket = self._issued
+        self._issued += 1
+        return ticket
+
+    def write(self, ticket, table):
+        """Buffer ``table`` once every earlier ticket has been written, and write
+        a row group if enough rows have piled up.
+
+        :param int ticket: Ticket from :any:`reserve`
+        :param table: ``pyarrow.Table`` to write
+        """
+        with self._turn_changed:
+            while self._turn != ticket:
+                self._turn_changed.wait()
+        try:
+            # only the holder of the current ticket gets here
+            self._buffer.append(table)
+            self._buffered += table.num_rows
+            self.rows += table.num_rows
+            if self._buffered >= self._row_group_size:
+                self._flush()
+        finally:
+            with self._turn_changed:
+                self._turn += 1
+                self._turn_changed.notify_all()
+
+    def close(self):
+        """Write what's left, close the file and return its manifest entry"""
+        self._flush()
+        self._writer.close()
+        return {"path": self.sub_path, "rows": self.rows}
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if self._buffer:
+            self._writer.write_table(
+                pa.concat_tables(self._buffer), row_group_size=self._row_group_size
+            )
+        self._buffer = []
+        self._buffered = 0
+
+
+def _column_types(sql):
+    """Return the Arrow type of every column a query returns that can be told
+    from its SQLAlchemy types, or an empty dict for text queries.
+
+    :param sql: A query
+    """
+    import pyarrow as pa
+
+    # subclasses go before their parents: bool is an int, datetime is a date
+    arrow_types = [
+        (bool, pa.bool_()),
+        (int, pa.int64()),
+        (float, pa.float64()),
+        # pandas.read_sql turns decimals into floats
+        (decimal.Decimal, pa.float64()),
+        (str, pa.string()),
+        (bytes, pa.binary()),
+        (datetime.datetime, pa.timestamp("ns")),
+        (datetime.date, pa.date32()),
+        (datetime.time, pa.time64("us")),
+    ]
+
+    columns = getattr(sql, "selected_columns", None)
+    if columns is None:
+        columns = getattr(sql, "columns", None)
+    if columns is None or not hasattr(columns, "keys"):
+        return {}
+
+    types = {}
+    for name, column in zip(columns.keys(), columns):
+        if getattr(column.type, "timezone", False):
+            continue  # leave the timezone to the data
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        for known, arrow_type in arrow_types:
+            if issubclass(python_type, known):
+                types[name] = arrow_type
+                break
+    return types
+
+
+def _resolve_schema(types, chunks, partition_by, max_chunks):
+    """Work out the Arrow schema every file is written with.
+
+    Columns without a type in ``types`` are inferred from the data. If a column is
+    all null in the first chunk, more chunks are read, up to ``max_chunks``, until
+    it has a value; columns that are still null after that become strings.
+
+    Returns a tuple (schema, chunks that were read to find it, names of the
+    columns that became strings).
+
+    :param dict types: Arrow type of the columns that are known in advance
+    :param chunks: Iterator of ``DataFrame`` chunks
+    :param list partition_by: Columns left out of the files
+    :param int max_chunks: Max number of chunks to read ahead
+    """
+    import pyarrow as pa
+
+    held_back = []
+    inferred = None
+    for chunk in chunks:
+        held_back.append(chunk)
+        data = chunk.drop(columns=partition_by)
+        unknown = [c for c in data.columns if c not in types]
+        schema = pa.Schema.from_pandas(data[unknown], preserve_index=False)
+        inferred = schema if inferred is None else pa.unify_schemas([inferred, schema])
+        if len(held_back) >= max_chunks or not any(
+            pa.types.is_null(f.type) for f in inferred
+        ):
+            break
+
+    if inferred is None:
+        return pa.schema([]), held_back, []
+
+    fields = []
+    stringified = []
+    for column in held_back[0].drop(columns=partition_by).columns:
+        if column in types:
+            fields.append(pa.field(column, types[column]))
+            continue
+        arrow_type = inferred.field(column).type
+        if pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+            stringified.append(column)
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields), held_back, stringified
+
+
+def _stringify(df, columns):
+    """Turn the values of ``columns`` into strings, leaving nulls alone
+
+    :param df: ``DataFrame`` about to be converted
+    :param list columns: Names of the columns
+    """
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        df[column] = df[column].map(lambda v: v if pd.isnull(v) else str(v))
+    return df
+
+
+def _get_query(client, table_or_sql):
+    """Turn a table name or :class:`sqlalchemy.schema.Table` into a select, and
+    leave queries untouched.
+
+    :param SqlClient client: Client used to look up table names
+    :param table_or_sql: A table name, :class:`sqlalchemy.schema.Table`, or query
+    """
+    if isinstance(table_or_sql, Table):
+        return table_or_sql.select()
+    if isinstance(table_or_sql, string_types) and len(table_or_sql.split()) == 1:
+        return client.get_table(table_or_sql).select()
+    return table_or_sql
+
+
+def _partition_dir(column, value):
+    """Hive style directory name for a partition value
+
+    :param str column: Name of the partition column
+    :param value: Value of the partition column
+    """
+    if pd.isnull(value):
+        value = NULL_PARTITION
+    return "{}={}".format(column, quote(str(value), safe=""))
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import os
+from builtins import super
+
+from future.utils import iteritems
+from sqlalchemy import inspect
+
+from .client import SqlClient, _parse_table_name
+from .transfer import (
+    _checkpoint_table,
+    _clear_checkpoint,
+    _move_checkpoint,
+    copy_table,
+)
+
+__all__ = ["MirrorClient"]
+
+#: Suffix of the table new snapshots are copied into before replacing the old one
+STAGING_SUFFIX = "__staging"
+
+
+class MirrorClient(SqlClient):
+    """A :any:`SqlClient` for a local embedded database (SQLite, DuckDB, ...) that
+    holds snapshots of tables and query results from another connection. Queries
+    against the mirror run locally instead of making a round trip to the source.
+
+    Mirrors are usually defined with a ``mirror`` section in a connection config
+    file, which makes them available in :any:`sql_connectors.connections` like any
+    other connection. Call :any:`refresh` to pull down new data.
+    """
+
+    def __init__(
+        self,
+        url,
+        source,
+        tables=None,
+        queries=None,
+        default_schema=None,
+        reflect=False,
+        statement_timeout=None,
+        **kwargs
+    ):
+        """Instanciate a :class:`MirrorClient` with the given params.
+
+        :param str url: Url of the local database
+        :param source: Function that returns the :any:`SqlClient` to mirror
+        :param dict tables: Mapping of local table name to either the source
+             table name or a dict with ``table`` (source table name), ``key``
+             (column or list of columns to refresh by, defaults to the primary key,
+             it should be unique and non-null since incremental refreshes only
+             fetch rows with a larger key)
+             and ``incremental`` (whether to only append rows after the last
+             ``key`` instead of taking a new snapshot) (Default value = None)
+        :param dict queries: Mapping of local table name to a query to run on the
+             source (Default value = None)
+
+        See :any:`SqlClient.__init__` for the rest of the params
+        """
+        database = getattr(url, "database", None)
+        if database and database != ":memory:":
+            directory = os.path.dirname(os.path.expanduser(database))
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+        super().__init__(url, default_schema, reflect, statement_timeout, **kwargs)
+
+        self._source = source
+        #: Tables to mirror, see :any:`__init__`
+        self.tables = tables or {}
+        #: Queries to mirror, see :any:`__init__`
+        self.queries = queries or {}
+
+    def __repr__(self):
+        return super().__repr__().replace("SqlClient", "MirrorClient")
+
+    @property
+    def source(self):
+        """The :any:`SqlClient` being mirrored"""
+        return self._source()
+
+    def refresh(self, names=None, full=False, chunksize=10000):
+        """Update the mirrored tables and queries from the source.
+
+        Incremental tables only fetch rows that come after the last ``key`` already
+        in the mirror. Everything else is copied again into a staging table that
+        then replaces the old one in a single transaction, so readers see either
+        the old or the new snapshot and a failed refresh leaves the old one alone.
+
+        Returns a dict with a :any:`CopyResult` for each table and the number of
+        rows for each query.
+
+        :param list names: Only refresh these tables/queries (Default value = None)
+        :param bool full: Take a new snapshot even for incremental tables
+             (Default value = False)
+        :param int chunksize: Number of rows to move at a time
+             (Default value = 10000)
+        """
+        source = self.source
+        results = {}
+
+        for name, spec in iteritems(self.tables):
+            if names is not None and name not in names:
+                continue
+            if not isinstance(spec, dict):
+                spec = {"table": spec}
+            if spec.get("incremental", False) and not full:
+                results[name] = copy_table(
+                    source,
+                    spec.get("table", name),
+                    self,
+                    name,
+                    key=spec.get("key"),
+                    chunksize=chunksize,
+                )
+                continue
+
+            staging = name + STAGING_SUFFIX
+            self._drop_table(staging)
+            results[name] = copy_table(
+                source,
+                spec.get("table", name),
+                self,
+                staging,
+                key=spec.get("key"),
+                chunksize=chunksize,
+                resume=False,
+            )
+            self._swap_table(staging, name)
+
+        for name, sql in iteritems(self.queries):
+            if names is not None and name not in names:
+                continue
+            staging = name + STAGING_SUFFIX
+            self._drop_table(staging)
+            results[name] = 0
+            for chunk in source.read_sql(sql, chunksize=chunksize):
+                chunk.to_sql(staging, self, if_exists="append", index=False)
+                results[name] += len(chunk)
+            staging_name, schema = _parse_table_name(staging, self.default_schema)
+            if not inspect(self).has_table(staging_name, schema=schema):
+                # no chunks came back, create the empty snapshot from the columns
+                empty = source.read_sql(sql)
+                empty.to_sql(staging, self, index=False)
+            self._swap_table(staging, name)
+
+        return results
+
+    def _drop_table(self, name):
+        """Drop a mirrored table and forget its metadata, if it exists
+
+        :param str name: Name of the table, can include schema name with dot notation
+        """
+        name, schema = _parse_table_name(name, self.default_schema)
+        if inspect(self).has_table(name, schema=schema):
+            table = self.get_table(name, schema=schema)
+            table.drop(bind=self)
+            self.metadata.remove(table)
+
+    def _swap_table(self, staging, name):
+        """Replace table ``name`` with ``staging`` in a single transaction, along
+        with its :any:`copy_table` checkpoint.
+
+        :param str staging: Name of the table holding the new snapshot
+        :param str name: Name of the table to replace
+        """
+        staging, schema = _parse_table_name(staging, self.default_schema)
+        name, _ = _parse_table_name(name, schema)
+        staging_table = self.get_table(staging, schema=schema)
+        quote = self.dialect.identifier_preparer.quote
+        checkpoints = _checkpoint_table(self, schema)
+
+        with self.begin() as conn:
+            # the checkpoint goes first: pysqlite only opens the transaction on DML,
+            # and the DDL after it would otherwise be committed right away
+            _clear_checkpoint(conn, checkpoints, name)
+            _move_checkpoint(conn, checkpoints, staging, name)
+            if inspect(conn).has_table(name, schema=schema):
+                old = self.get_table(name, schema=schema)
+                old.drop(bind=conn)
+                self.metadata.remove(old)
+            conn.execute(
+                "ALTER TABLE {} RENAME TO {}".format(
+                    self.dialect.identifier_preparer.format_table(staging_table),
+                    quote(name),
+                )
+            )
+        self.metadata.remove(staging_table)
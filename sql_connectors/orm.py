@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from itertools import islice
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+__all__ = ["BulkSession"]
+
+
+class BulkSession(Session):
+    """A :class:`sqlalchemy.orm.session.Session` with a helper to persist lots of
+    rows at once. This is the session class used by :any:`SqlClient.create_session`.
+    """
+
+    def bulk_persist(self, items, mapper=None, update=False, batch_size=1000):
+        """Insert or update many rows using one ``executemany`` per batch instead
+        of tracking and flushing every object. Objects are not added to the
+        session, and the changes are part of the current transaction so they still
+        need to be committed.
+
+        Returns the number of rows persisted.
+
+        :param items: Iterable of mapped objects, or of dicts if ``mapper`` is given
+        :param mapper: Mapped class, like the ones from :any:`SqlClient.table_factory`
+             (Default value = class of the first item)
+        :param bool update: Whether to update existing rows by primary key instead
+             of inserting (Default value = False)
+        :param int batch_size: Number of rows per statement (Default value = 1000)
+        """
+        items = iter(items)
+        persist = self.bulk_update_mappings if update else self.bulk_insert_mappings
+        count = 0
+
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                return count
+            if mapper is None:
+                if isinstance(batch[0], dict):
+                    raise ValueError("mapper is required to persist dicts")
+                mapper = type(batch[0])
+            persist(mapper, [_as_mapping(item) for item in batch])
+            count += len(batch)
+
+
+def _as_mapping(item):
+    """Return the column values that have been set on a mapped object as a dict,
+    leaving dicts untouched.
+
+    :param item: Mapped object or dict
+    """
+    if isinstance(item, dict):
+        return item
+    state = inspect(item)
+    return dict(
+        (attr.key, state.dict[attr.key])
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    )
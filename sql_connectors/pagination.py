@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import datetime
+import decimal
+import json
+
+import pandas as pd
+from sqlalchemy import Table, and_, literal, or_, select, tuple_
+
+from .exceptions import SQLConnectorException
+from .execution import QueryGuard
+
+__all__ = ["KeysetIterator", "seek_predicate"]
+
+
+class KeysetIterator(object):
+    """Iterate over a table one page at a time using keyset (seek) pagination.
+    Instead of ``OFFSET``, every page asks for the rows after the last key seen,
+    so with an index on the key each page takes the same time no matter how deep
+    into the table it is.
+
+    After each page, :any:`cursor` holds a token that can be saved and passed back
+    in to resume from that point later.
+
+    For example::
+
+        pages = SqlClientInstance.iter_table('big_table', page_size=1000)
+        for df in pages:
+            ... do things with df
+            save_somewhere(pages.cursor)
+    """
+
+    def __init__(
+        self,
+        client,
+        table,
+        key=None,
+        page_size=10000,
+        cursor=None,
+        as_frame=True,
+        schema=None,
+        timeout=None,
+    ):
+        """
+        :param SqlClient client: Client to read with
+        :param table: Name of the table, can include schema name with dot notation,
+             or a :class:`sqlalchemy.schema.Table`
+        :param key: Column name or list of column names to page by. They should be
+             unique, non-null, and indexed (Default value = primary key)
+        :param int page_size: Number of rows per page (Default value = 10000)
+        :param str cursor: Token from :any:`cursor` to resume after
+             (Default value = None)
+        :param bool as_frame: Whether to yield ``DataFrame`` pages, otherwise lists
+             of rows (Default value = True)
+        :param str schema: Explicitly give schema name (Default value = None)
+        :param float timeout: Seconds each page is allowed to take
+             (Default value = None)
+        """
+        if not isinstance(table, Table):
+            table = client.get_table(table, schema=schema)
+
+        if key is None:
+            key = [c.name for c in table.primary_key.columns]
+        elif not isinstance(key, (list, tuple)):
+            key = [key]
+        if not key:
+            raise SQLConnectorException(
+                "{} has no primary key, a key is required".format(table.name)
+            )
+
+        self.client = client
+        self.table = table
+        self.key = [table.c[k] for k in key]
+        self.page_size = page_size
+        self.as_frame = as_frame
+        self.timeout = timeout
+
+        #: Token for the last row returned, pass it as ``cursor`` to resume after it
+        self.cursor = cursor
+        self._last = decode_cursor(cursor) if cursor else None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        query = select([self.table]).order_by(*self.key).limit(self.page_size)
+        if self._last is not None:
+            query = query.where(
+                seek_predicate(self.key, self._last, self.client.dialect)
+            )
+
+        guard = QueryGuard(self.timeout) if self.timeout else None
+        with self.client._read_connection(guard) as conn:
+            result = conn.execute(query)
+            columns = list(result.keys())
+            rows = result.fetchall()
+
+        if not rows:
+            raise StopIteration
+
+        self._last = [rows[-1][c.name] for c in self.key]
+        self.cursor = encode_cursor(self._last)
+
+        if self.as_frame:
+            return pd.DataFrame.from_records(rows, columns=columns)
+        return rows
+
+    next = __next__
+
+
+def seek_predicate(columns, values, dialect=None):
+    """Build the condition for rows coming after ``values`` when ordered by
+    ``columns``.
+
+    Composite keys use the row value comparison ``(a, b) > (x, y)`` on dialects
+    that support it, which databases can turn into a range scan of the index.
+    Elsewhere it's spelled out as ``a >= x AND (a > x OR (a = x AND b > y))``,
+    where the redundant first bound still lets the index skip the rows before.
+
+    :param list columns: Key columns, in sort order
+    :param list values: Key values of the last row seen
+    :param dialect: The :class:`sqlalchemy.engine.interfaces.Dialect` the query
+         runs on (Default value = None, spell it out)
+    """
+    if len(columns) == 1:
+        return columns[0] > values[0]
+
+    if _supports_row_values(dialect):
+        return tuple_(*columns) > tuple_(
+            *[literal(v, c.type) for c, v in zip(columns, values)]
+        )
+
+    return and_(
+        columns[0] >= values[0],
+        or_(
+            *[
+                and_(
+                    *[c == v for c, v in zip(columns[:i], values[:i])]
+                    + [columns[i] > values[i]]
+                )
+                for i in range(len(columns))
+            ]
+        ),
+    )
+
+
+def _supports_row_values(dialect):
+    """Whether a dialect can compare row values like ``(a, b) > (x, y)``
+
+    :param dialect: A :class:`sqlalchemy.engine.interfaces.Dialect`, or None
+    """
+    if dialect is None:
+        return False
+    if dialect.name == "sqlite":
+        # row values were added in SQLite 3.15
+        version = getattr(dialect.dbapi, "sqlite_version_info", (0,))
+        return tuple(version) >= (3, 15)
+    return dialect.name in ["postgresql", "mysql"]
+
+
+def encode_cursor(values):
+    """Turn key values into an opaque, url-safe cursor token
+
+    :param list values: Key values of the last row seen
+    """
+    data = json.dumps([_encode_value(v) for v in values])
+    return base64.urlsafe_b64encode(data.encode("utf8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Turn a cursor token back into key values
+
+    :param str cursor: Token from :any:`encode_cursor`
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf8")
+        return [_decode_value(v) for v in json.loads(data)]
+    except (TypeError, ValueError):
+        raise SQLConnectorException("Invalid cursor {}".format(cursor))
+
+
+def _encode_value(value):
+    """JSON friendly version of a key value that keeps its type"""
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    if isinstance(value, bytes):
+        return {"bytes": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_value(value):
+    """Inverse of :any:`_encode_value`"""
+    if not isinstance(value, dict):
+        return value
+    if "datetime" in value:
+        return pd.Timestamp(value["datetime"]).to_pydatetime()
+    if "date" in value:
+        return pd.Timestamp(value["date"]).date()
+    if "decimal" in value:
+        return decimal.Decimal(value["decimal"])
+    return base64.b64decode(value["bytes"])
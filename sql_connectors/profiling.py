@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Boolean,
+    Float,
+    Integer,
+    LargeBinary,
+    Numeric,
+    PickleType,
+    Table,
+    distinct,
+    func,
+    select,
+    tablesample,
+    text,
+)
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+from sqlalchemy.dialects.postgresql import UUID
+
+from .exceptions import SQLConnectorException
+
+__all__ = ["profile_table"]
+
+#: Dialects with an approximate distinct count, and the function to use
+APPROX_DISTINCT = {
+    "bigquery": "approx_count_distinct",
+    "mssql": "approx_count_distinct",
+    "presto": "approx_distinct",
+    "snowflake": "approx_count_distinct",
+    "trino": "approx_distinct",
+}
+
+#: Dialects with an approximate percentile function taking (column, fraction)
+APPROX_PERCENTILE = {
+    "presto": "approx_percentile",
+    "snowflake": "approx_percentile",
+    "trino": "approx_percentile",
+}
+
+#: Types that can't be compared, so no distinct counts, min or max
+UNORDERED_TYPES = (ARRAY, JSON, LargeBinary, PickleType)
+
+#: Types that can be compared for equality but have no ``min`` or ``max``
+NO_MIN_MAX_TYPES = (Boolean, UNIQUEIDENTIFIER, UUID)
+
+#: Types that get a mean and quantiles
+NUMERIC_TYPES = (Float, Integer, Numeric)
+
+
+def profile_table(
+    client,
+    table,
+    schema=None,
+    sample=None,
+    quantiles=(0.25, 0.5, 0.75),
+    timeout=None,
+    distinct_counts=True,
+):
+    """Compute summary statistics for every column of a table inside the database.
+
+    A single aggregate query is built from the reflected columns, so only the
+    statistics come back over the wire. Every column gets its non-null count,
+    null count and fraction, and distinct count. Comparable columns also get their
+    min and max, and numeric columns their mean and, on dialects that support it,
+    quantiles.
+
+    Distinct counts are estimated where the database has an estimate: from the
+    planner statistics in ``pg_stats`` on Postgres (for columns that have been
+    analyzed, and for the whole table even when sampling), and with an approximate
+    count on the dialects in :any:`APPROX_DISTINCT`. Everywhere else they are exact
+    ``count(DISTINCT ...)``, which has to sort or hash every value and is usually
+    the most expensive part of the query; pass ``distinct_counts=False`` to skip
+    them.
+
+    Returns a ``DataFrame`` with one row per column and one column per statistic.
+
+    :param SqlClient client: Client to run the query with
+    :param table: Name of the table, can include schema name with dot notation, or
+         a :class:`sqlalchemy.schema.Table`
+    :param str schema: Explicitly give schema name (Default value = None)
+    :param float sample: Fraction of rows to sample, between 0 and 1. Uses
+         ``TABLESAMPLE`` on Postgres and a random filter on SQLite and MySQL
+         (Default value = None, whole table)
+    :param tuple quantiles: Quantiles to compute for numeric columns
+         (Default value = (0.25, 0.5, 0.75))
+    :param float timeout: Seconds the query is allowed to run for
+         (Default value = None)
+    :param bool distinct_counts: Whether to count distinct values
+         (Default value = True)
+    """
+    if not isinstance(table, Table):
+        table = client.get_table(table, schema=schema)
+    dialect = client.dialect.name
+
+    estimates = {}
+    if distinct_counts and dialect == "postgresql":
+        estimates = _pg_distinct_estimates(client, table)
+
+    source, where = _sample(table, dialect, sample)
+    quantile_func = _quantile_func(dialect)
+
+    keys = []
+    exprs = [func.count().label("n_rows")]
+
+    def add(column_name, stat, expr):
+        exprs.append(expr.label("c{}".format(len(keys))))
+        keys.append((column_name, stat))
+
+    for column in source.columns:
+        type_ = column.type
+        add(column.name, "count", func.count(column))
+        if isinstance(type_, UNORDERED_TYPES):
+            continue
+
+        if distinct_counts and column.name not in estimates:
+            if dialect in APPROX_DISTINCT:
+                distinct_count = getattr(func, APPROX_DISTINCT[dialect])(column)
+            else:
+                distinct_count = func.count(distinct(column))
+            add(column.name, "distinct", distinct_count)
+
+        if isinstance(type_, NO_MIN_MAX_TYPES):
+            continue
+        add(column.name, "min", func.min(column))
+        add(column.name, "max", func.max(column))
+
+        if isinstance(type_, NUMERIC_TYPES):
+            add(column.name, "mean", func.avg(column))
+            if quantile_func is not None:
+                for q in quantiles:
+                    add(column.name, _quantile_name(q), quantile_func(column, q))
+
+    query = select(exprs).select_from(source)
+    if where is not None:
+        query = query.where(where)
+
+    values = list(client.read_sql(query, timeout=timeout).values[0])
+    rows = values[0]
+
+    counts = dict(
+        (name, value)
+        for (name, stat), value in zip(keys, values[1:])
+        if stat == "count"
+    )
+    for name, n_distinct in estimates.items():
+        if name in counts and not isinstance(table.c[name].type, UNORDERED_TYPES):
+            keys.append((name, "distinct"))
+            values.append(_from_n_distinct(n_distinct, rows, counts[name]))
+
+    stats = pd.Series(
+        values[1:], index=pd.MultiIndex.from_tuples(keys), dtype=object
+    ).unstack()
+
+    order = ["count", "distinct", "min", "max", "mean"] + [
+        _quantile_name(q) for q in quantiles
+    ]
+    stats = stats.reindex(
+        index=[c.name for c in table.columns],
+        columns=[s for s in order if s in stats.columns],
+    )
+    stats.insert(1, "nulls", rows - stats["count"])
+    stats.insert(2, "null_fraction", stats["nulls"] / rows if rows else 0.0)
+    return stats.infer_objects()
+
+
+def _quantile_name(q):
+    """Name of the statistic for a quantile, like ``describe`` does: 0.25 -> 25%"""
+    return "{:g}%".format(q * 100)
+
+
+def _sample(table, dialect, sample):
+    """Return what to select from and the filter needed to sample ``table``
+
+    :param table: A :class:`sqlalchemy.schema.Table`
+    :param str dialect: Name of the dialect
+    :param float sample: Fraction of rows to sample, or None for all of them
+    """
+    if sample is None or sample >= 1:
+        return table, None
+    if dialect == "postgresql":
+        return tablesample(table, func.system(sample * 100)), None
+    if dialect == "sqlite":
+        return table, func.abs(func.random()) % 1000000 < int(sample * 1000000)
+    if dialect == "mysql":
+        return table, func.rand() < sample
+    raise SQLConnectorException("Sampling is not supported for {}".format(dialect))
+
+
+def _pg_distinct_estimates(client, table):
+    """Return the planner's ``n_distinct`` estimate for every analyzed column of
+    a Postgres table.
+
+    :param SqlClient client: Client to run the query with
+    :param table: A :class:`sqlalchemy.schema.Table`
+    """
+    # inherited rows cover child tables and partitions too, which a select on the
+    # parent also reads, so they take precedence
+    query = text(
+        "SELECT attname, n_distinct FROM pg_stats "
+        "WHERE schemaname = coalesce(:schema, current_schema()) "
+        "AND tablename = :table ORDER BY inherited"
+    )
+    result = client.execute(query, schema=table.schema, table=table.name)
+    return dict((name, n_distinct) for name, n_distinct in result)
+
+
+def _from_n_distinct(n_distinct, rows, count):
+    """Turn a Postgres ``n_distinct`` into a number of distinct values. Negative
+    values are a fraction of the rows, and the result is capped at the number of
+    non-null values since the estimate is for the whole table.
+
+    :param float n_distinct: Value from ``pg_stats``
+    :param int rows: Number of rows
+    :param int count: Number of non-null values
+    """
+    if n_distinct < 0:
+        n_distinct = -n_distinct * rows
+    return min(int(round(n_distinct)), count)
+
+
+def _quantile_func(dialect):
+    """Return a function building a quantile expression for a column, or None if
+    the dialect can't compute quantiles.
+
+    :param str dialect: Name of the dialect
+    """
+    if dialect in APPROX_PERCENTILE:
+        return lambda column, q: getattr(func, APPROX_PERCENTILE[dialect])(column, q)
+    if dialect in ["postgresql", "oracle"]:
+        return lambda column, q: func.percentile_cont(q).within_group(column)
+    return None
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.exc import DBAPIError
+
+from .exceptions import ConfigurationException
+
+__all__ = ["ReplicaRouter"]
+
+#: Weight given to the newest response time in the moving average
+LATENCY_SMOOTHING = 0.2
+
+
+class ReplicaRouter(object):
+    """Spread reads over a set of read replicas, falling back to the primary when
+    none of them are healthy.
+
+    Replicas are picked with one of these strategies:
+
+    * ``round_robin``: take turns
+    * ``least_outstanding``: the replica with the fewest queries in flight
+    * ``latency``: random, weighted by the inverse of the average time replicas
+      take to answer a health check
+
+    Replicas start out in rotation and get pinged by a background thread, once
+    when the router is created so an unreachable replica doesn't hold up startup,
+    and then every ``health_check_interval`` seconds. Replicas that fail a health
+    check or can't be connected to for a read are taken out of rotation until
+    they answer again.
+    """
+
+    STRATEGIES = ["round_robin", "least_outstanding", "latency"]
+
+    def __init__(
+        self, primary, replicas, strategy="round_robin", health_check_interval=30
+    ):
+        """
+        :param primary: :class:`sqlalchemy.engine.Engine` for the primary
+        :param list replicas: :class:`sqlalchemy.engine.Engine` for each replica
+        :param str strategy: One of :any:`STRATEGIES` (Default value = 'round_robin')
+        :param float health_check_interval: Seconds between health checks, ``None``
+             only checks once on startup (Default value = 30)
+        """
+        if strategy not in self.STRATEGIES:
+            raise ConfigurationException(
+                "Unknown routing strategy {}, use one of {}".format(
+                    strategy, ", ".join(self.STRATEGIES)
+                )
+            )
+
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._healthy = set(range(len(self.replicas)))
+        self._outstanding = [0] * len(self.replicas)
+        self._latency = [None] * len(self.replicas)
+
+        self._stop = threading.Event()
+        self._checker = threading.Thread(target=self._run_health_checks)
+        self._checker.daemon = True
+        self._checker.start()
+
+    @property
+    def healthy_replicas(self):
+        """Replicas currently in rotation"""
+        with self._lock:
+            return [r for i, r in enumerate(self.replicas) if i in self._healthy]
+
+    @contextmanager
+    def connect(self):
+        """Open a connection for a read and keep track of it while it's in use.
+        Replicas that can't be connected to are taken out of rotation and the next
+        one is tried, falling back to the primary when none are left.
+        """
+        tried = set()
+        while True:
+            index = self._choose(tried)
+            engine = self.primary if index is None else self.replicas[index]
+            try:
+                conn = engine.connect()
+                break
+            except DBAPIError:
+                if index is None:
+                    raise
+                tried.add(index)
+                self._set_health(index, False)
+
+        if index is None:
+            with conn:
+                yield conn
+            return
+
+        with self._lock:
+            self._outstanding[index] += 1
+        try:
+            with conn:
+                yield conn
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                self._set_health(index, False)
+            raise
+        finally:
+            with self._lock:
+                self._outstanding[index] -= 1
+
+    def check_health(self):
+        """Ping every replica once and update which ones are in rotation"""
+        for index, replica in enumerate(self.replicas):
+            start = time.time()
+            try:
+                with replica.connect() as conn:
+                    conn.execute(select([literal_column("1")]))
+            except Exception:
+                self._set_health(index, False)
+            else:
+                self._set_health(index, True)
+                self._record_latency(index, time.time() - start)
+
+    def close(self):
+        """Stop the health checks and dispose of the replicas' connection pools"""
+        self._stop.set()
+        for replica in self.replicas:
+            replica.dispose()
+
+    def _choose(self, exclude=()):
+        """Return the index of the replica to use, or ``None`` for the primary
+
+        :param exclude: Indexes of replicas to skip (Default value = ())
+        """
+        with self._lock:
+            healthy = sorted(self._healthy.difference(exclude))
+            if not healthy:
+                return None
+
+            if self.strategy == "round_robin":
+                return healthy[next(self._turn) % len(healthy)]
+
+            if self.strategy == "least_outstanding":
+                return min(healthy, key=lambda i: self._outstanding[i])
+
+            known = [self._latency[i] for i in healthy if self._latency[i]]
+            # replicas without measurements yet get the best known latency so
+            # they get tried
+            default = min(known) if known else 1.0
+            weights = [1.0 / (self._latency[i] or default) for i in healthy]
+            point = random.uniform(0, sum(weights))
+            for index, weight in zip(healthy, weights):
+                point -= weight
+                if point <= 0:
+                    return index
+            return healthy[-1]
+
+    def _set_health(self, index, healthy):
+        with self._lock:
+            if healthy:
+                self._healthy.add(index)
+            else:
+                self._healthy.discard(index)
+
+    def _record_latency(self, index, seconds):
+        with self._lock:
+            previous = self._latency[index]
+            if previous is None:
+                self._latency[index] = seconds
+            else:
+                self._latency[index] = (
+                    LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous
+                )
+
+    def _run_health_checks(self):
+        self.check_health()
+        if not self.health_check_interval:
+            return
+        while not self._stop.wait(self.health_check_interval):
+            self.check_health()
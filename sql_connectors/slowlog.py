@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""Slow query log for :any:`SqlClient`.
+
+Queries that take longer than a threshold are written as JSON lines to a rotating
+log file, together with the query plan, the connection they ran on, the shape of
+their bind parameters, and how long was spent executing versus fetching.
+
+The log can be summarized by statement fingerprint with::
+
+    python -m sql_connectors.slowlog [path]
+"""
+
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+from six.moves import queue
+from sqlalchemy import event
+
+__all__ = ["SlowQueryLog", "fingerprint", "read_log", "summarize"]
+
+#: Where the log goes when no path is given
+DEFAULT_PATH = "~/.config/sql_connectors/logs/slow_queries.log"
+
+#: Max number of slow queries waiting for their plan, more are logged without one
+EXPLAIN_QUEUE_SIZE = 100
+
+#: Prefix to get the plan of a statement for each dialect, and whether the plan
+#: comes back as a single JSON value
+EXPLAIN = {
+    "mysql": ("EXPLAIN FORMAT=JSON ", True),
+    "postgresql": ("EXPLAIN (FORMAT JSON) ", True),
+    "sqlite": ("EXPLAIN QUERY PLAN ", False),
+}
+
+_NORMALIZE = [
+    (re.compile(r"--[^\n]*|/\*.*?\*/", re.S), " "),  # comments
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+"), "?"),  # bind parameters
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),  # IN lists
+    (re.compile(r"\s+"), " "),
+]
+
+
+# one logger per log file, shared by every SlowQueryLog writing to it, along with
+# how many of them use it
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+_STOP = object()
+
+
+def _get_logger(path, max_bytes, backup_count):
+    """Return the logger writing to ``path``, creating it the first time. Every
+    :any:`SlowQueryLog` for the same file shares it, so only one handler ever
+    rotates the file.
+    """
+    with _loggers_lock:
+        if path not in _loggers:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            name = hashlib.md5(path.encode("utf8")).hexdigest()
+            logger = logging.getLogger("{}.{}".format(__name__, name))
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            _loggers[path] = [logger, 0]
+        _loggers[path][1] += 1
+        return _loggers[path][0]
+
+
+def _release_logger(path):
+    """Stop using the logger for ``path``, closing its file once nobody does"""
+    with _loggers_lock:
+        _loggers[path][1] -= 1
+        if _loggers[path][1] == 0:
+            logger, _ = _loggers.pop(path)
+            for handler in list(logger.handlers):
+                handler.close()
+                logger.removeHandler(handler)
+
+
+def fingerprint(statement):
+    """Normalize a statement so the same query with different literals or bind
+    parameters looks the same. Returns a tuple (hash, normalized statement).
+
+    :param str statement: SQL statement
+    """
+    normalized = statement
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip().lower()
+    return hashlib.md5(normalized.encode("utf8")).hexdigest()[:16], normalized
+
+
+class SlowQueryLog(object):
+    """Record queries on a :any:`SqlClient` that take longer than ``threshold``
+    seconds. This is usually set up with :any:`SqlClient.log_slow_queries`.
+
+    Every statement is timed through SQLAlchemy's cursor events. Queries run
+    through :any:`SqlClient.read_sql` also get their fetch time measured, and are
+    logged once the ``DataFrame`` is built; everything else is logged as soon as
+    it has executed. Plans are captured by a background thread, so the query
+    that was slow doesn't wait for its ``EXPLAIN``.
+    """
+
+    def __init__(
+        self,
+        client,
+        threshold,
+        path=None,
+        explain=True,
+        max_bytes=10 * 1024 * 1024,
+        backup_count=5,
+    ):
+        """
+        :param SqlClient client: Client whose queries to log
+        :param float threshold: Seconds after which a query is logged
+        :param str path: Log file (Default value = :any:`DEFAULT_PATH`)
+        :param bool explain: Whether to capture the plan of slow queries
+             (Default value = True)
+        :param int max_bytes: Size at which the log is rotated, only used by the
+             first log for a file (Default value = 10MB)
+        :param int backup_count: Number of rotated logs to keep, only used by the
+             first log for a file (Default value = 5)
+        """
+        self.client = client
+        self.threshold = threshold
+        self.path = os.path.abspath(os.path.expanduser(path or DEFAULT_PATH))
+        self.explain = explain
+        self._local = threading.local()
+        self.logger = _get_logger(self.path, max_bytes, backup_count)
+
+        self._explain_queue = None
+        self._explainer = None
+        if explain:
+            self._explain_queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+            self._explainer = threading.Thread(target=self._run_explains)
+            self._explainer.daemon = True
+            self._explainer.start()
+
+        self._engines = [client]
+        if client.router is not None:
+            self._engines.extend(client.router.replicas)
+        for engine in self._engines:
+            event.listen(engine, "before_cursor_execute", self._before_execute)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def close(self):
+        """Stop logging, after writing the queries still waiting for their plan"""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before_execute)
+            event.remove(engine, "after_cursor_execute", self._after_execute)
+        if self._explainer is not None:
+            self._explain_queue.put(_STOP)
+            self._explainer.join()
+            self._explainer = None
+        _release_logger(self.path)
+
+    @contextmanager
+    def measure(self):
+        """Time everything executed in this block, including fetching the results,
+        and log the statements that were slow when it ends. The time that isn't
+        spent executing is attributed to the last statement that returned rows.
+        """
+        executed = []
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        self._local.stack.append(executed)
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._local.stack.pop()
+            total = time.time() - start
+
+            fetching = [q for q in executed if q["returns_rows"]]
+            if fetching:
+                fetching[-1]["fetch_s"] = max(
+                    total - sum(q["execute_s"] for q in executed), 0.0
+                )
+            for query in executed:
+                self._maybe_log(query)
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("slow_query_start", []).append(time.time())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        query = {
+            "engine": conn.engine,
+            "statement": statement,
+            "parameters": parameters,
+            "executemany": executemany,
+            "execute_s": time.time() - conn.info["slow_query_start"].pop(),
+            "fetch_s": None,
+            "returns_rows": cursor.description is not None,
+        }
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].append(query)
+        else:
+            self._maybe_log(query)
+
+    def _maybe_log(self, query):
+        total = query["execute_s"] + (query["fetch_s"] or 0.0)
+        if total < self.threshold:
+            return
+
+        hashed, normalized = fingerprint(query["statement"])
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "connection": self.client.connection_name,
+            "env": self.client.env,
+            "host": query["engine"].url.host,
+            "dialect": self.client.dialect.name,
+            "fingerprint": hashed,
+            "normalized": normalized,
+            "statement": query["statement"],
+            "parameters": _parameter_shape(query["parameters"], query["executemany"]),
+            "execute_s": query["execute_s"],
+            "fetch_s": query["fetch_s"],
+            "total_s": total,
+            "plan": None,
+        }
+        if self._explainer is not None and not query["executemany"]:
+            try:
+                self._explain_queue.put_nowait((record, query))
+                return
+            except queue.Full:
+                record["plan"] = {"error": "too many queries waiting for a plan"}
+        self.logger.info(json.dumps(record, default=str))
+
+    def _run_explains(self):
+        """Capture the plan of the slow queries handed over by :any:`_maybe_log`
+        and write them to the log, until :any:`close` is called.
+        """
+        while True:
+            item = self._explain_queue.get()
+            if item is _STOP:
+                return
+            record, query = item
+            record["plan"] = self._explain(
+                query["engine"], query["statement"], query["parameters"]
+            )
+            self.logger.info(json.dumps(record, default=str))
+
+    def _explain(self, engine, statement, parameters):
+        """Return the plan for a statement, or None if there's no way to get it"""
+        dialect = engine.dialect.name
+        if dialect not in EXPLAIN:
+            return None
+        if statement.lstrip().split(None, 1)[0].lower() not in ["select", "with"]:
+            return None
+
+        prefix, single_value = EXPLAIN[dialect]
+        try:
+            # use a raw connection so the plan query doesn't trigger events
+            conn = engine.raw_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            return {"error": str(e)}
+
+        if single_value:
+            plan = rows[0][0]
+            return json.loads(plan) if isinstance(plan, str) else plan
+        return [list(row) for row in rows]
+
+
+def _parameter_shape(parameters, executemany=False):
+    """Describe bind parameters by type without logging their values
+
+    :param parameters: Parameters as given to the DBAPI cursor
+    :param bool executemany: Whether ``parameters`` is a list of parameter sets
+    """
+    if executemany:
+        parameters = list(parameters)
+        return {
+            "rows": len(parameters),
+            "shape": _parameter_shape(parameters[0]) if parameters else None,
+        }
+    if isinstance(parameters, dict):
+        return dict((k, type(v).__name__) for k, v in parameters.items())
+    return [type(v).__name__ for v in parameters or []]
+
+
+def read_log(path=None):
+    """Read a slow query log, including its rotated backups, into a ``DataFrame``
+
+    :param str path: Log file (Default value = :any:`DEFAULT_PATH`)
+    """
+    path = os.path.expanduser(path or DEFAULT_PATH)
+    records = []
+    for log_file in sorted(glob.glob(path + ".*"), reverse=True) + [path]:
+        if not os.path.exists(log_file):
+            continue
+        with open(log_file) as reader:
+            records.extend(json.loads(line) for line in reader if line.strip())
+    return pd.DataFrame.from_records(records)
+
+
+def summarize(path=None, sort_by="total_s"):
+    """Aggregate a slow query log by statement fingerprint
+
+    :param str path: Log file (Default value = :any:`DEFAULT_PATH`)
+    :param str sort_by: Column to sort by, descending (Default value = 'total_s')
+    """
+    log = read_log(path)
+    if log.empty:
+        return log
+
+    summary = log.groupby("fingerprint").agg(
+        count=("total_s", "size"),
+        total_s=("total_s", "sum"),
+        mean_s=("total_s", "mean"),
+        max_s=("total_s", "max"),
+        execute_s=("execute_s", "mean"),
+        fetch_s=("fetch_s", "mean"),
+        connections=("connection", lambda c: ", ".join(sorted(set(map(str, c))))),
+        statement=("normalized", "first"),
+    )
+    return summary.sort_values(sort_by, ascending=False)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Summarize a sql_connectors slow query log by statement"
+    )
+    parser.add_argument("path", nargs="?", default=None, help="log file")
+    parser.add_argument(
+        "--sort",
+        default="total_s",
+        choices=["count", "total_s", "mean_s", "max_s"],
+        help="column to sort by",
+    )
+    parser.add_argument("--limit", type=int, default=20, help="rows to show")
+    parser.add_argument(
+        "--width", type=int, default=80, help="max width of the statement column"
+    )
+    options = parser.parse_args(args)
+
+    summary = summarize(options.path, options.sort)
+    if summary.empty:
+        print("No slow queries logged")
+        return
+    summary["statement"] = summary["statement"].str.slice(0, options.width)
+    with pd.option_context("display.width", None, "display.max_colwidth", None):
+        print(summary.head(options.limit).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+import re
+import shutil
+import tempfile
+import weakref
+
+import pandas as pd
+from six import string_types
+
+from .exceptions import SQLConnectorException
+from .export import _column_types, _resolve_schema, _stringify
+
+__all__ = ["SpilledFrame", "spill_to_disk"]
+
+#: Chunks read ahead to find the type of columns that are all null at the start
+SCHEMA_CHUNKS = 4
+
+# names a DataFrame.query expression could refer to, either `quoted` or bare
+_IDENTIFIER = re.compile(r"`([^`]+)`|([^\W\d]\w*)", re.U)
+
+
+def spill_to_disk(chunks, scratch_dir=None, sql=None):
+    """Write ``DataFrame`` chunks to Arrow IPC files in a new scratch directory and
+    return a :any:`SpilledFrame` over them. Only one chunk is in memory at a time,
+    except while up to :any:`SCHEMA_CHUNKS` are read ahead to find the type of
+    columns that are all null at the start.
+
+    Every file gets the same schema, so a chunk where a column happens to be all
+    null still comes back with that column's type.
+
+    :param chunks: Iterable of ``DataFrame``
+    :param str scratch_dir: Where to create the scratch directory
+         (Default value = None, the system temp dir)
+    :param sql: Query the chunks come from, used to type columns up front where
+         its SQLAlchemy types allow (Default value = None, inferred from the data)
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise SQLConnectorException(
+            "pyarrow is required to spill results to disk, "
+            "install sql_connectors[parquet]"
+        )
+
+    directory = tempfile.mkdtemp(
+        prefix="sql_connectors_",
+        dir=os.path.expanduser(scratch_dir) if scratch_dir else None,
+    )
+    store = _SpillStore(directory)
+    try:
+        chunks = iter(chunks)
+        schema, held_back, stringified = _resolve_schema(
+            _column_types(sql), chunks, [], SCHEMA_CHUNKS
+        )
+        for number, chunk in enumerate(itertools.chain(held_back, chunks)):
+            table = pa.Table.from_pandas(
+                _stringify(chunk, stringified), schema=schema, preserve_index=False
+            )
+            path = os.path.join(directory, "chunk-{:05d}.arrow".format(number))
+            with pa.OSFile(path, "wb") as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_table(table)
+            store.files.append(path)
+    except BaseException:
+        store.cleanup()
+        raise
+    return SpilledFrame(store)
+
+
+class _SpillStore(object):
+    """Owns the scratch directory and deletes it once no :any:`SpilledFrame`
+    uses it anymore.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = []
+        self.cleanup = weakref.finalize(self, shutil.rmtree, directory, True)
+
+
+class SpilledFrame(object):
+    """Lazy handle over query results that were spilled to memory-mapped Arrow
+    files, as returned by :any:`SqlClient.read_sql` with ``spill=True``.
+
+    Nothing is loaded until it's asked for, and then only one chunk at a time
+    unless calling :any:`to_pandas`. :any:`select` and :any:`filter` return new
+    handles over the same files, so they can be chained::
+
+        big = SqlClientInstance.read_sql('select * from huge_table', spill=True)
+        for df in big.filter('amount > 100').select(['id', 'amount']):
+            ... do things with each chunk
+
+    The files are deleted when :any:`close` is called, when used as a context
+    manager, or once every handle over them has been garbage collected.
+    """
+
+    def __init__(self, store, columns=None, filters=()):
+        self._store = store
+        self._columns = list(columns) if columns is not None else None
+        self._filters = tuple(filters)
+
+    def __repr__(self):
+        return "SpilledFrame({} chunks in {}, columns={})".format(
+            len(self._store.files), self._store.directory, self.columns
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def __len__(self):
+        if self._filters:
+            return sum(len(df) for df in self.iter_chunks())
+        return sum(table.num_rows for table in self._read_tables())
+
+    @property
+    def columns(self):
+        """Names of the columns this handle returns"""
+        if self._columns is not None:
+            return list(self._columns)
+        for table in self._read_tables():
+            return list(table.column_names)
+        return []
+
+    @property
+    def closed(self):
+        """Whether the files have been deleted"""
+        return not self._store.cleanup.alive
+
+    def select(self, columns):
+        """Return a handle that only reads the given columns
+
+        :param list columns: Column names
+        """
+        return SpilledFrame(self._store, columns, self._filters)
+
+    def filter(self, condition, columns=None):
+        """Return a handle that only returns the rows matching ``condition``
+
+        :param condition: Either an expression for :any:`pandas.DataFrame.query`, or
+             a function taking a ``DataFrame`` and returning a boolean mask
+        :param list columns: Columns ``condition`` uses. Only these and the
+             selected ones are loaded to filter each chunk (Default value = None,
+             the names in the expression, or every column for a function)
+        """
+        return SpilledFrame(
+            self._store, self._columns, self._filters + ((condition, columns),)
+        )
+
+    def iter_chunks(self):
+        """Yield the results one ``DataFrame`` chunk at a time"""
+        for table in self._read_tables():
+            if not self._filters:
+                if self._columns is not None:
+                    table = table.select(self._columns)
+                yield table.to_pandas()
+                continue
+
+            needed = self._needed_columns(table.column_names)
+            if needed is not None:
+                table = table.select(needed)
+            df = table.to_pandas()
+            for condition, _ in self._filters:
+                if isinstance(condition, string_types):
+                    df = df.query(condition)
+                else:
+                    df = df[condition(df)]
+            if self._columns is not None:
+                df = df[self._columns]
+            yield df
+
+    def head(self, n=5):
+        """Return the first ``n`` rows
+
+        :param int n: Number of rows (Default value = 5)
+        """
+        frames = []
+        rows = 0
+        for df in self.iter_chunks():
+            frames.append(df.head(n - rows))
+            rows += len(frames[-1])
+            if rows >= n:
+                break
+        return _concat(frames, self._columns)
+
+    def to_pandas(self):
+        """Load everything into a single ``DataFrame``"""
+        return _concat(list(self.iter_chunks()), self._columns)
+
+    def close(self):
+        """Delete the spilled files. Every handle over them stops working."""
+        self._store.cleanup()
+
+    def _needed_columns(self, available):
+        """Return the columns to load from a chunk to filter it and return the
+        selected columns, or None if every column is needed.
+
+        :param list available: Columns of the chunk
+        """
+        if self._columns is None:
+            return None
+        needed = set(self._columns)
+        for condition, columns in self._filters:
+            if columns is None:
+                if not isinstance(condition, string_types):
+                    return None
+                columns = _IDENTIFIER.findall(condition)
+                columns = [quoted or bare for quoted, bare in columns]
+            needed.update(columns)
+        return [c for c in available if c in needed]
+
+    def _read_tables(self):
+        """Yield each spilled chunk as a memory-mapped ``pyarrow.Table``"""
+        import pyarrow as pa
+
+        if self.closed:
+            raise SQLConnectorException("SpilledFrame has been closed")
+
+        for path in self._store.files:
+            with pa.memory_map(path, "r") as source:
+                yield pa.ipc.open_file(source).read_all()
+
+
+def _concat(frames, columns=None):
+    """Concatenate chunks, returning an empty ``DataFrame`` if there are none
+
+    :param list frames: ``DataFrame`` chunks
+    :param list columns: Columns for the empty result (Default value = None)
+    """
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
@@ -15,10 +15,14 @@ from sqlalchemy.engine.url import URL
 from .client import SqlClient
 from .config_util import get_key_value, set_key_value
 from .exceptions import ConfigurationException, SQLConnectorException
+from .mirror import MirrorClient
 from .util import extend_docs
 
 __all__ = ["Storage", "LocalStorage"]
 
+#: Keys of an env that describe read replicas rather than the url itself
+ROUTING_KEYS = ["hosts", "routing", "health_check_interval"]
+
 
 class Namespace(object):
     def __init__(self, **kwargs):
@@ -52,6 +56,9 @@ class Storage(object):
                 defaults["default_env"],
                 '"{0}"'.format(schema) if schema is not None else schema,
                 defaults["default_reflect"],
+                defaults["default_statement_timeout"],
+                defaults["default_slow_query_threshold"],
+                name,
             )
             connections["{}".format(name)] = client_getter
             connections["{}_envs".format(name)] = env_getter
@@ -79,14 +86,55 @@ class Storage(object):
         env_conf = conf[env]
         env_conf["drivername"] = drivername
 
-        if "sqlite" not in drivername:
+        if not any(embedded in drivername for embedded in ["sqlite", "duckdb"]):
             env_conf["username"] = self._get_username(env_conf)
 
             env_conf["password"] = self._get_password(env_conf)
 
             env_conf.pop("allowed_hosts", [])
 
-        return URL(**env_conf)
+        url_conf = dict((k, v) for k, v in iteritems(env_conf) if k not in ROUTING_KEYS)
+        primary = self._get_hosts(env_conf, "primary")
+        if len(primary) > 1:
+            raise ConfigurationException("Only one primary host is allowed")
+        for host in primary:
+            url_conf["host"] = host["host"]
+            url_conf["port"] = host.get("port", url_conf.get("port"))
+
+        return URL(**url_conf)
+
+    def _get_hosts(self, env_conf, role):
+        """Return the entries of ``hosts`` in an env with the given role. Hosts
+        without a role are the primary.
+
+        :param dict env_conf: The env section of a config file
+        :param str role: Either 'primary' or 'replica'
+        """
+        return [
+            host
+            for host in env_conf.get("hosts", [])
+            if host.get("role", "primary") == role
+        ]
+
+    def _get_replica_urls(self, url, env_conf):
+        """Return a url for each read replica in an env, using the same settings
+        as the primary ``url`` except for host and port.
+
+        :param url: :class:`sqlalchemy.engine.url.URL` for the primary
+        :param dict env_conf: The env section of a config file
+        """
+        return [
+            URL(
+                drivername=url.drivername,
+                username=url.username,
+                password=url.password,
+                host=host["host"],
+                port=host.get("port", url.port),
+                database=url.database,
+                query=url.query,
+            )
+            for host in self._get_hosts(env_conf, "replica")
+        ]
 
     def _get_available_envs_factory(self, conf):
         """Create a :any:`get_available_envs` function for the given config
@@ -105,6 +153,9 @@ class Storage(object):
                 "default_env",
                 "default_schema",
                 "default_reflect",
+                "default_statement_timeout",
+                "default_slow_query_threshold",
+                "mirror",
             ]
             return [key for key in keys if key not in non_envs]
 
@@ -135,8 +186,9 @@ class Storage(object):
         return password
 
     def _get_config_defaults(self, conf):
-        """Return the default_env, default_schema, and default_reflect from a
-        config file.
+        """Return the default_env, default_schema, default_reflect,
+        default_statement_timeout, and default_slow_query_threshold from a config
+        file.
 
         :param str path: Path for config file
         """
@@ -144,11 +196,20 @@ class Storage(object):
             "default_env": "default",
             "default_schema": None,
             "default_reflect": False,
+            "default_statement_timeout": None,
+            "default_slow_query_threshold": None,
         }
         return dict((k, conf.get(k, defaults[k])) for k in defaults)
 
     def _get_client_factory(
-        self, conf, default_env="default", default_schema=None, default_reflect=False
+        self,
+        conf,
+        default_env="default",
+        default_schema=None,
+        default_reflect=False,
+        default_statement_timeout=None,
+        default_slow_query_threshold=None,
+        name=None,
     ):
         """Wrapper function to create a :any:`get_client` function using the given
         ``config`` and setting the given defaults. This should be used in the submodule
@@ -158,6 +219,11 @@ class Storage(object):
         :param str default_env: Set default environment to use (Default value = 'default')
         :param str default_schema: Set default schema to use  (Default value = None)
         :param bool default_reflect: Set default for reflect  (Default value = False)
+        :param float default_statement_timeout: Set default statement timeout in
+             seconds (Default value = None)
+        :param float default_slow_query_threshold: Set default threshold in seconds
+             for the slow query log (Default value = None)
+        :param str name: Name of the connection (Default value = None)
         """
 
         @extend_docs(SqlClient.__init__)
@@ -165,19 +231,87 @@ class Storage(object):
             env=default_env,
             default_schema=default_schema,
             reflect=default_reflect,
+            statement_timeout=default_statement_timeout,
+            slow_query_threshold=default_slow_query_threshold,
             **kwargs
         ):
             """Get a :any:`SqlClient` for the specified
             environment. Defaults are based on what was passed to :any:`get_client_factory`.
 
+            If ``slow_query_threshold`` is set, queries slower than that many seconds
+            get logged, see :any:`SqlClient.log_slow_queries`.
+
             See :any:`SqlClient.__init__` for params:
             """
-            return SqlClient(
-                self._parse_config(conf, env), default_schema, reflect, **kwargs
+            client = self._create_client(
+                conf, env, default_schema, reflect, statement_timeout, **kwargs
             )
+            client.connection_name = name
+            client.env = env
+            if slow_query_threshold is not None:
+                client.log_slow_queries(
+                    slow_query_threshold, path=self._get_slow_query_log_path()
+                )
+            return client
 
         return memoized(get_client, signature_preserving=True)
 
+    def _create_client(
+        self, conf, env, default_schema, reflect, statement_timeout, **kwargs
+    ):
+        """Create the right kind of :any:`SqlClient` for a config and env
+
+        :param str conf: Name of config file without the extension
+        :param str env: Name of the environment within the config file
+
+        See :any:`SqlClient.__init__` for the rest of the params
+        """
+        if "mirror" in conf:
+            mirror = conf["mirror"]
+            return MirrorClient(
+                self._parse_config(conf, env),
+                self._get_mirror_source_factory(mirror),
+                mirror.get("tables"),
+                mirror.get("queries"),
+                default_schema,
+                reflect,
+                statement_timeout,
+                **kwargs
+            )
+
+        url = self._parse_config(conf, env)
+        replicas = self._get_replica_urls(url, conf[env])
+        if replicas:
+            kwargs.setdefault("replicas", replicas)
+            for key in ["routing", "health_check_interval"]:
+                if key in conf[env]:
+                    kwargs.setdefault(key, conf[env][key])
+
+        return SqlClient(url, default_schema, reflect, statement_timeout, **kwargs)
+
+    def _get_slow_query_log_path(self):
+        """Return where the slow query log should go, or None for the default"""
+        return None
+
+    def _get_mirror_source_factory(self, mirror):
+        """Create a function that returns the client for the connection a mirror
+        copies its data from.
+
+        :param dict mirror: The ``mirror`` section of a config file
+        """
+        if "source" not in mirror:
+            raise ConfigurationException("Missing mirror source")
+
+        source = mirror["source"]
+        env = mirror.get("env")
+
+        def get_source():
+            """Return the client being mirrored"""
+            get_client = getattr(self.connections, source)
+            return get_client() if env is None else get_client(env=env)
+
+        return get_source
+
 
 class LocalStorage(Storage):
     def __init__(self, path_or_uri):
@@ -190,6 +324,10 @@ class LocalStorage(Storage):
         """
         return os.path.join(os.path.expanduser(self._path_or_uri), sub_path)
 
+    def _get_slow_query_log_path(self):
+        """Keep the slow query log in the config dir"""
+        return self._full_path(os.path.join("logs", "slow_queries.log"))
+
     def _check_path(self):
         """Check if the provided path exists. If not, raise ConfigurationException.
         """
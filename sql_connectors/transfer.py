@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import threading
+import time
+from collections import namedtuple
+
+from six.moves import queue
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.exc import CompileError
+
+from .client import _parse_table_name
+from .exceptions import SQLConnectorException
+from .pagination import decode_cursor, encode_cursor, seek_predicate
+
+__all__ = ["copy_table", "CopyResult"]
+
+#: Summary of a :any:`copy_table` run. ``resumed`` is the number of rows that
+#: were already copied when the copy started, and ``cursor`` is the key of the
+#: last row committed, as a token from :any:`encode_cursor`.
+CopyResult = namedtuple(
+    "CopyResult",
+    ["rows", "chunks", "seconds", "rows_per_second", "resumed", "cursor"],
+)
+
+#: Table in the destination where :any:`copy_table` records the last key it
+#: committed for each table
+CHECKPOINT_TABLE = "sql_connectors_copy_state"
+
+_DONE = object()
+
+
+def copy_table(
+    src_client,
+    src_table,
+    dst_client,
+    dst_table=None,
+    key=None,
+    chunksize=10000,
+    queue_size=4,
+    resume=True,
+    progress=None,
+):
+    """Copy a table from one :any:`SqlClient` to another without loading it all
+    in memory.
+
+    The source table is reflected with :any:`SqlClient.get_table` and the
+    destination table is created with the same columns if it doesn't exist, using
+    the closest generic type when the destination dialect can't render the source
+    type. A reader thread fetches ``chunksize`` rows at a time and hands them to a
+    writer thread through a queue holding at most ``queue_size`` chunks, so memory
+    stays constant and reads overlap with writes. Each chunk is committed in its
+    own transaction.
+
+    Rows are read in ``key`` order (the primary key by default). Along with each
+    chunk, the key of its last row is saved to :any:`CHECKPOINT_TABLE` in the
+    destination, so a copy that failed halfway picks up right after the last
+    committed chunk when called again with ``resume=True``. Calling it again
+    after it finished copies only the rows added to the source since.
+
+    :param SqlClient src_client: Client to read from
+    :param src_table: Name of the source table, can include schema name with dot
+         notation, or a :class:`sqlalchemy.schema.Table`
+    :param SqlClient dst_client: Client to write to
+    :param str dst_table: Name of the destination table, can include schema name
+         with dot notation (Default value = name of the source table)
+    :param key: Column name or list of column names to order and resume by. They
+         should be unique and non-null, rows sharing the key of the last
+         committed row are skipped when resuming
+         (Default value = primary key of the source table)
+    :param int chunksize: Number of rows per chunk (Default value = 10000)
+    :param int queue_size: Max number of chunks waiting to be written
+         (Default value = 4)
+    :param bool resume: Whether to continue from the last checkpoint, otherwise
+         the rows already in the destination are deleted first. Resuming into a
+         table that has rows but no checkpoint raises an error
+         (Default value = True)
+    :param progress: Function called with a :any:`CopyResult` after each chunk
+         is committed (Default value = None)
+    :returns: :any:`CopyResult`
+    """
+    if not isinstance(src_table, Table):
+        src_table = src_client.get_table(src_table)
+    dst_table = _get_or_create_table(dst_client, dst_table or src_table.name, src_table)
+
+    if key is None:
+        key = [c.name for c in src_table.primary_key.columns]
+    elif not isinstance(key, (list, tuple)):
+        key = [key]
+    src_key = [src_table.c[k] for k in key]
+
+    query = select([src_table]).order_by(*src_key)
+    checkpoints = _checkpoint_table(dst_client, dst_table.schema)
+    state = None
+    if resume:
+        state = _load_checkpoint(dst_client, checkpoints, dst_table.name)
+        if state is None:
+            has_rows = dst_client.execute(
+                select([func.count()]).select_from(dst_table)
+            ).scalar()
+            if has_rows:
+                raise SQLConnectorException(
+                    "{} already has rows that weren't copied by copy_table, use "
+                    "resume=False to replace them".format(dst_table.name)
+                )
+        else:
+            query = query.where(
+                seek_predicate(src_key, decode_cursor(state[0]), src_client.dialect)
+            )
+    else:
+        with dst_client.begin() as conn:
+            conn.execute(dst_table.delete())
+            _clear_checkpoint(conn, checkpoints, dst_table.name)
+
+    names = [c.name for c in src_table.columns]
+    chunks = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    resumed = state[1] if state else 0
+    stats = {
+        "rows": 0,
+        "chunks": 0,
+        "cursor": state[0] if state else None,
+    }
+    start = time.time()
+
+    def summary():
+        seconds = time.time() - start
+        return CopyResult(
+            stats["rows"],
+            stats["chunks"],
+            seconds,
+            stats["rows"] / seconds if seconds else 0.0,
+            resumed,
+            stats["cursor"],
+        )
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def read():
+        try:
+            with src_client.connect() as conn:
+                result = conn.execution_options(stream_results=True).execute(query)
+                while not stop.is_set():
+                    rows = result.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    put([dict(zip(names, row)) for row in rows])
+                result.close()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(_DONE)
+
+    def write():
+        try:
+            while not stop.is_set():
+                try:
+                    rows = chunks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if rows is _DONE:
+                    break
+                cursor = encode_cursor([rows[-1][k] for k in key]) if key else None
+                with dst_client.begin() as conn:
+                    conn.execute(dst_table.insert(), rows)
+                    if cursor is not None:
+                        _save_checkpoint(
+                            conn,
+                            checkpoints,
+                            dst_table.name,
+                            cursor,
+                            resumed + stats["rows"] + len(rows),
+                        )
+                stats["cursor"] = cursor
+                stats["rows"] += len(rows)
+                stats["chunks"] += 1
+                if progress is not None:
+                    progress(summary())
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=read), threading.Thread(target=write)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return summary()
+
+
+def _checkpoint_table(client, schema=None):
+    """Return :any:`CHECKPOINT_TABLE` for a client, creating it if needed
+
+    :param SqlClient client: Client copied to
+    :param str schema: Schema to keep it in (Default value = None)
+    """
+    table = Table(
+        CHECKPOINT_TABLE,
+        MetaData(),
+        Column("table_name", String(255), primary_key=True),
+        Column("cursor", Text, nullable=False),
+        Column("rows", Integer, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+        schema=schema,
+    )
+    table.create(bind=client, checkfirst=True)
+    return table
+
+
+def _load_checkpoint(client, checkpoints, name):
+    """Return a tuple (cursor, rows) for the last chunk copied into ``name``, or
+    None if there's no checkpoint.
+    """
+    row = client.execute(
+        select([checkpoints.c.cursor, checkpoints.c.rows]).where(
+            checkpoints.c.table_name == name
+        )
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+def _save_checkpoint(conn, checkpoints, name, cursor, rows):
+    """Record the key of the last row committed into ``name``. Meant to run in
+    the same transaction as the insert.
+    """
+    values = {
+        "cursor": cursor,
+        "rows": rows,
+        "updated_at": datetime.datetime.utcnow(),
+    }
+    updated = conn.execute(
+        checkpoints.update().where(checkpoints.c.table_name == name), values
+    )
+    if not updated.rowcount:
+        values["table_name"] = name
+        conn.execute(checkpoints.insert(), values)
+
+
+def _clear_checkpoint(conn, checkpoints, name):
+    """Forget where the copy into ``name`` was"""
+    conn.execute(checkpoints.delete().where(checkpoints.c.table_name == name))
+
+
+def _move_checkpoint(conn, checkpoints, old, new):
+    """Make the checkpoint of ``old`` the checkpoint of ``new``, when a table is
+    renamed.
+    """
+    conn.execute(
+        checkpoints.update().where(checkpoints.c.table_name == old),
+        {"table_name": new},
+    )
+
+
+def _get_or_create_table(client, name, like):
+    """Return the table ``name`` from ``client``, creating it with the columns of
+    ``like`` if it doesn't exist yet.
+
+    :param SqlClient client: Client where the table lives
+    :param str name: Name of the table, can include schema name with dot notation
+    :param like: :class:`sqlalchemy.schema.Table` to copy the columns from
+    """
+    name, schema = _parse_table_name(name, client.default_schema)
+    if inspect(client).has_table(name, schema=schema):
+        return client.get_table(name, schema=schema)
+
+    columns = [
+        Column(
+            c.name,
+            _portable_type(c.type, client.dialect),
+            primary_key=c.primary_key,
+            nullable=c.nullable,
+        )
+        for c in like.columns
+    ]
+    table = Table(name, client.metadata, *columns, schema=schema)
+    table.create(bind=client)
+    return table
+
+
+def _portable_type(type_, dialect):
+    """Return ``type_`` if ``dialect`` can render it, otherwise the closest generic
+    SQLAlchemy type, keeping length and precision where possible.
+
+    :param type_: A :class:`sqlalchemy.types.TypeEngine`
+    :param dialect: The :class:`sqlalchemy.engine.interfaces.Dialect` to render for
+    """
+    candidates = [type_]
+    generic = type_._type_affinity
+    if generic is not None:
+        kwargs = dict(
+            (attr, getattr(type_, attr))
+            for attr in ("length", "precision", "scale", "timezone")
+            if getattr(type_, attr, None) is not None
+        )
+        try:
+            candidates.append(generic(**kwargs))
+        except TypeError:
+            candidates.append(generic())
+
+    for candidate in candidates:
+        try:
+            candidate.compile(dialect=dialect)
+            return candidate
+        except CompileError:
+            pass
+    return Text()
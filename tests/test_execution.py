@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for timeouts and cancellation in `sql_connectors.execution`."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from sql_connectors.client import SqlClient
+from sql_connectors.exceptions import QueryCancelled, QueryTimeout
+from sql_connectors.execution import QueryGuard
+
+# never finishes on its own
+ENDLESS_QUERY = (
+    "with recursive r(i) as (select 1 union all select i + 1 from r) "
+    "select count(*) from r"
+)
+
+
+class TestExecution(unittest.TestCase):
+    """Tests for `read_sql` timeouts and `read_sql_async`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.client.execute("create table t (id integer primary key)")
+        self.client.execute(
+            "insert into t (id) "
+            "with recursive s(i) as (select 1 union all select i + 1 from s "
+            "where i < 400) select i from s"
+        )
+
+    def tearDown(self):
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def test_timeout(self):
+        start = time.time()
+        with self.assertRaises(QueryTimeout):
+            self.client.read_sql(ENDLESS_QUERY, timeout=0.3)
+        self.assertLess(time.time() - start, 5)
+
+    def test_default_statement_timeout(self):
+        self.client.statement_timeout = 0.3
+        with self.assertRaises(QueryTimeout):
+            self.client.read_sql(ENDLESS_QUERY)
+
+    def test_connection_usable_after_timeout(self):
+        with self.assertRaises(QueryTimeout):
+            self.client.read_sql(ENDLESS_QUERY, timeout=0.3)
+        self.assertEqual(self.client.read_sql("select count(*) as n from t").n[0], 400)
+
+    def test_time_between_chunks_not_counted(self):
+        rows = 0
+        for chunk in self.client.read_sql(
+            "select * from t", chunksize=100, timeout=0.5
+        ):
+            time.sleep(0.3)
+            rows += len(chunk)
+        self.assertEqual(rows, 400)
+
+    def test_async_result(self):
+        handle = self.client.read_sql_async("select count(*) as n from t", timeout=5)
+        self.assertEqual(handle.result(timeout=5).n[0], 400)
+        self.assertTrue(handle.done())
+        self.assertFalse(handle.cancelled())
+
+    def test_async_cancel(self):
+        handle = self.client.read_sql_async(ENDLESS_QUERY)
+        time.sleep(0.2)
+        start = time.time()
+        handle.cancel()
+        self.assertLess(time.time() - start, 5)
+        self.assertTrue(handle.done())
+        self.assertTrue(handle.cancelled())
+        with self.assertRaises(QueryCancelled):
+            handle.result()
+
+    def test_async_timeout(self):
+        handle = self.client.read_sql_async(ENDLESS_QUERY, timeout=0.3)
+        with self.assertRaises(QueryTimeout):
+            handle.result(timeout=5)
+
+    def test_guard_pause(self):
+        guard = QueryGuard(0.2)
+        guard.pause()
+        self.assertTrue(guard.paused)
+        time.sleep(0.3)
+        self.assertFalse(guard.expired)
+
+        guard.resume()
+        self.assertFalse(guard.paused)
+        time.sleep(0.3)
+        self.assertTrue(guard.expired)
+        self.assertEqual(guard.remaining, 0.0)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.export`."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_connectors.client import SqlClient
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class TestExportParquet(unittest.TestCase):
+    """Tests for `SqlClient.export_parquet`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "out")
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.client.execute(
+            "create table t (id integer primary key, x integer, r text)"
+        )
+        # x is null for the first 1500 rows, so several chunks have no values for it
+        self.client.execute(
+            "insert into t "
+            "with recursive s(i) as (select 1 union all select i + 1 from s "
+            "where i < 2000) "
+            "select i, case when i > 1500 then i end, "
+            "case i % 2 when 0 then 'even' else 'odd' end from s"
+        )
+
+    def tearDown(self):
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def check(self, table_or_sql, **kwargs):
+        manifest = self.client.export_parquet(
+            table_or_sql, self.path, chunk_rows=500, overwrite=True, **kwargs
+        )
+        table = pq.read_table(self.path)
+        self.assertEqual(manifest["rows"], 2000)
+        self.assertEqual(table.num_rows, 2000)
+        self.assertEqual(str(table.schema.field("x").type), "int64")
+        self.assertEqual(table.column("x").null_count, 1500)
+
+        with open(os.path.join(self.path, "_manifest.json")) as reader:
+            self.assertEqual(json.load(reader), manifest)
+        return manifest
+
+    def test_table(self):
+        manifest = self.check("t", row_group_size=1000)
+        self.assertEqual(len(manifest["files"]), 1)
+        parquet_file = pq.ParquetFile(
+            os.path.join(self.path, manifest["files"][0]["path"])
+        )
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+
+    def test_query_partitioned(self):
+        manifest = self.check("select * from t", partition_by=["r"])
+        self.assertEqual(
+            [f["path"] for f in manifest["files"]],
+            [
+                os.path.join("r=even", "part-00000.parquet"),
+                os.path.join("r=odd", "part-00000.parquet"),
+            ],
+        )
+        self.assertEqual([f["rows"] for f in manifest["files"]], [1000, 1000])
+
+    def test_order(self):
+        # more workers than chunks in flight per file, files still follow the query
+        manifest = self.check(
+            "select * from t order by id desc", max_workers=8, rows_per_file=1000
+        )
+        self.assertEqual(
+            [f["path"] for f in manifest["files"]],
+            ["part-00000.parquet", "part-00001.parquet"],
+        )
+        ids = []
+        for entry in manifest["files"]:
+            table = pq.read_table(os.path.join(self.path, entry["path"]))
+            ids.extend(table.column("id").to_pylist())
+        self.assertEqual(ids, list(range(2000, 0, -1)))
+
+    def test_order_partitioned(self):
+        self.client.export_parquet(
+            "select * from t order by id desc",
+            self.path,
+            partition_by=["r"],
+            chunk_rows=100,
+            max_workers=8,
+        )
+        for value, start in [("even", 2000), ("odd", 1999)]:
+            table = pq.read_table(
+                os.path.join(self.path, "r=" + value, "part-00000.parquet")
+            )
+            self.assertEqual(table.column("id").to_pylist(), list(range(start, 0, -2)))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.mirror`."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from sqlalchemy import inspect
+
+from sql_connectors.client import SqlClient
+from sql_connectors.mirror import MirrorClient
+from sql_connectors.storage import LocalStorage
+
+
+class TestMirrorClient(unittest.TestCase):
+    """Tests for `MirrorClient.refresh`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = SqlClient("sqlite:///" + os.path.join(self.dir, "source.db"))
+        self.source.execute("create table orders (id integer primary key, total int)")
+        self.source.execute("insert into orders values (1, 10), (2, 20), (3, 30)")
+        self.mirror = MirrorClient(
+            "sqlite:///" + os.path.join(self.dir, "mirror.db"),
+            lambda: self.source,
+            tables={
+                "orders": "orders",
+                "orders_log": {"table": "orders", "key": "id", "incremental": True},
+            },
+            queries={
+                "big": "select id, total from orders where total > 15",
+                "none": "select id, total from orders where total < 0",
+            },
+        )
+
+    def tearDown(self):
+        self.source.dispose()
+        self.mirror.dispose()
+        shutil.rmtree(self.dir)
+
+    def rows(self, table):
+        return [
+            tuple(r)
+            for r in self.mirror.execute("select * from {} order by id".format(table))
+        ]
+
+    def table_names(self):
+        return sorted(inspect(self.mirror).get_table_names())
+
+    def change_source(self):
+        self.source.execute("update orders set total = 11 where id = 1")
+        self.source.execute("insert into orders values (4, 40)")
+
+    def test_refresh(self):
+        results = self.mirror.refresh()
+        self.assertEqual(results["orders"].rows, 3)
+        self.assertEqual(results["orders_log"].rows, 3)
+        self.assertEqual(results["big"], 2)
+        self.assertEqual(results["none"], 0)
+        self.assertEqual(self.rows("orders"), [(1, 10), (2, 20), (3, 30)])
+        self.assertEqual(self.rows("big"), [(2, 20), (3, 30)])
+        self.assertEqual(self.rows("none"), [])
+        self.assertNotIn("none__staging", self.table_names())
+
+    def test_refresh_again(self):
+        self.mirror.refresh()
+        self.change_source()
+        results = self.mirror.refresh()
+
+        # snapshots pick up updates, incremental tables only new rows
+        self.assertEqual(self.rows("orders"), [(1, 11), (2, 20), (3, 30), (4, 40)])
+        self.assertEqual(results["orders_log"].rows, 1)
+        self.assertEqual(self.rows("orders_log"), [(1, 10), (2, 20), (3, 30), (4, 40)])
+        self.assertEqual(self.rows("big"), [(2, 20), (3, 30), (4, 40)])
+        self.assertEqual(self.rows("none"), [])
+        self.assertFalse([t for t in self.table_names() if t.endswith("__staging")])
+
+    def test_refresh_full(self):
+        self.mirror.refresh()
+        self.change_source()
+        results = self.mirror.refresh(names=["orders_log"], full=True)
+
+        self.assertEqual(list(results), ["orders_log"])
+        self.assertEqual(results["orders_log"].rows, 4)
+        self.assertEqual(self.rows("orders_log"), [(1, 11), (2, 20), (3, 30), (4, 40)])
+        # only the named tables are refreshed
+        self.assertEqual(self.rows("orders"), [(1, 10), (2, 20), (3, 30)])
+
+    def test_empty_query_keeps_table(self):
+        self.mirror.refresh()
+        self.source.execute("update orders set total = 0")
+        self.mirror.refresh()
+        self.assertEqual(self.rows("big"), [])
+        self.assertIn("big", self.table_names())
+
+
+class TestMirrorConfig(unittest.TestCase):
+    """Tests for mirrors defined in a `LocalStorage` config dir."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        source = SqlClient("sqlite:///" + os.path.join(self.dir, "source.db"))
+        source.execute("create table orders (id integer primary key, total int)")
+        source.execute("insert into orders values (1, 10), (2, 20)")
+        source.dispose()
+
+        configs = {
+            "source": {
+                "drivername": "sqlite",
+                "relative_paths": ["database"],
+                "default": {"database": "source.db"},
+            },
+            "source_mirror": {
+                "drivername": "sqlite",
+                "relative_paths": ["database"],
+                "default": {"database": "mirrors/source_mirror.db"},
+                "mirror": {
+                    "source": "source",
+                    "tables": {"orders": "orders"},
+                    "queries": {"totals": "select sum(total) as total from orders"},
+                },
+            },
+        }
+        for name, conf in configs.items():
+            with open(os.path.join(self.dir, name + ".json"), "w") as writer:
+                json.dump(conf, writer)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_mirror_from_config(self):
+        connections = LocalStorage(self.dir + "/").connections
+        self.assertEqual(connections.source_mirror_envs(), ["default"])
+
+        mirror = connections.source_mirror()
+        self.assertIsInstance(mirror, MirrorClient)
+        self.assertEqual(
+            mirror.url.database, os.path.join(self.dir, "mirrors", "source_mirror.db")
+        )
+        self.assertIs(mirror.source, connections.source())
+
+        mirror.refresh()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.dir, "mirrors", "source_mirror.db"))
+        )
+        self.assertEqual(mirror.read_sql("select count(*) as n from orders").n[0], 2)
+        self.assertEqual(mirror.read_sql("select total from totals").total[0], 30)
+        mirror.dispose()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.orm` and `SqlClient.table_factory`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_connectors.client import SqlClient
+from sql_connectors.orm import BulkSession
+
+
+class TestTableFactory(unittest.TestCase):
+    """Tests for `SqlClient.table_factory`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.client.execute("create table t (id integer primary key, name text)")
+        self.client.execute("create table nopk (code text, name text)")
+
+    def tearDown(self):
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def test_cached(self):
+        model = self.client.table_factory("t")
+        self.assertIs(self.client.table_factory("t"), model)
+        self.assertEqual(model.__name__, "t")
+
+    def test_not_reflected_again(self):
+        model = self.client.table_factory("t")
+        calls = []
+        get_table = self.client.get_table
+        self.client.get_table = lambda *a, **kw: calls.append(a) or get_table(*a, **kw)
+        self.assertIs(self.client.table_factory("t"), model)
+        self.assertEqual(calls, [])
+
+    def test_primary_key(self):
+        model = self.client.table_factory("t")
+        by_name = self.client.table_factory("t", primarykey=["name"])
+        self.assertIsNot(by_name, model)
+        self.assertIs(self.client.table_factory("t", primarykey=["name"]), by_name)
+        # the plain name is taken, so this one gets qualified
+        self.assertEqual(by_name.__name__, "t__name")
+
+        nopk = self.client.table_factory("nopk", primarykey=["code"])
+        self.assertEqual(nopk.__name__, "nopk")
+
+
+class TestBulkPersist(unittest.TestCase):
+    """Tests for `BulkSession.bulk_persist`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.client.execute("create table t (id integer primary key, name text)")
+        self.model = self.client.table_factory("t")
+        self.session = self.client.create_session()
+
+    def tearDown(self):
+        self.session.close()
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def rows(self):
+        return [tuple(r) for r in self.client.execute("select * from t order by id")]
+
+    def test_session_class(self):
+        self.assertIsInstance(self.session, BulkSession)
+
+    def test_objects(self):
+        objects = (self.model(id=i, name="row {}".format(i)) for i in range(1, 6))
+        self.assertEqual(self.session.bulk_persist(objects, batch_size=2), 5)
+        # objects aren't tracked by the session
+        self.assertEqual(len(self.session.new), 0)
+        self.session.commit()
+        self.assertEqual(self.rows(), [(i, "row {}".format(i)) for i in range(1, 6)])
+
+    def test_dicts(self):
+        rows = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        with self.assertRaises(ValueError):
+            self.session.bulk_persist(rows)
+        self.assertEqual(self.session.bulk_persist(rows, mapper=self.model), 2)
+        self.session.commit()
+        self.assertEqual(self.rows(), [(1, "a"), (2, "b")])
+
+    def test_update(self):
+        self.session.bulk_persist(
+            [{"id": i, "name": "old"} for i in range(1, 4)], mapper=self.model
+        )
+        self.session.commit()
+
+        updated = self.session.bulk_persist(
+            [self.model(id=1, name="new"), self.model(id=3, name="new")], update=True
+        )
+        self.assertEqual(updated, 2)
+        self.session.commit()
+        self.assertEqual(self.rows(), [(1, "new"), (2, "old"), (3, "new")])
+
+    def test_rollback(self):
+        self.session.bulk_persist([self.model(id=1, name="a")])
+        self.session.rollback()
+        self.assertEqual(self.rows(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.pagination`."""
+
+import datetime
+import decimal
+import os
+import shutil
+import tempfile
+import unittest
+
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table
+
+from sql_connectors.client import SqlClient
+from sql_connectors.pagination import decode_cursor, encode_cursor, seek_predicate
+
+
+class TestKeysetIterator(unittest.TestCase):
+    """Tests for `SqlClient.iter_table`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.table = Table(
+            "events",
+            MetaData(),
+            Column("day", Date, primary_key=True),
+            Column("seq", Integer, primary_key=True),
+            Column("name", String(20)),
+        )
+        self.table.create(bind=self.client)
+        self.client.execute(
+            self.table.insert(),
+            [
+                {
+                    "day": datetime.date(2020, 1, 1 + i % 5),
+                    "seq": i,
+                    "name": "event {}".format(i),
+                }
+                for i in range(103)
+            ],
+        )
+
+    def tearDown(self):
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def test_pages(self):
+        pages = list(self.client.iter_table("events", page_size=10))
+        self.assertEqual([len(p) for p in pages], [10] * 10 + [3])
+
+        rows = [(r.day, r.seq) for p in pages for r in p.itertuples()]
+        self.assertEqual(len(set(rows)), 103)
+        self.assertEqual(rows, sorted(rows))
+
+    def test_resume_from_cursor(self):
+        pages = self.client.iter_table("events", page_size=10)
+        first = [next(pages) for _ in range(3)]
+        cursor = pages.cursor
+
+        rest = list(self.client.iter_table("events", page_size=10, cursor=cursor))
+        self.assertEqual(sum(len(p) for p in first + rest), 103)
+        self.assertGreater(
+            (rest[0].day[0], rest[0].seq[0]),
+            (first[-1].day.iloc[-1], first[-1].seq.iloc[-1]),
+        )
+
+    def test_cursor_round_trip(self):
+        values = [
+            datetime.datetime(2020, 1, 2, 3, 4, 5),
+            datetime.date(2020, 1, 2),
+            decimal.Decimal("1.50"),
+            b"\x00\xff",
+            "text",
+            42,
+        ]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_seek_predicate_row_values(self):
+        day, seq = self.table.c.day, self.table.c.seq
+        predicate = seek_predicate(
+            [day, seq], [datetime.date(2020, 1, 1), 5], self.client.dialect
+        )
+        self.assertIn("(events.day, events.seq) >", str(predicate))
+
+        expanded = seek_predicate([day, seq], [datetime.date(2020, 1, 1), 5])
+        self.assertIn("events.day >=", str(expanded))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.profiling`."""
+
+import unittest
+
+import pandas as pd
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.dialects.postgresql import UUID
+
+from sql_connectors.client import SqlClient
+from sql_connectors.profiling import _from_n_distinct
+
+
+class TestProfile(unittest.TestCase):
+    """Tests for `SqlClient.profile`."""
+
+    def setUp(self):
+        self.client = SqlClient("sqlite://")
+        pd.DataFrame(
+            {
+                "id": [1, 2, 3, 4],
+                "amount": [1.0, None, 3.0, 5.0],
+                "name": ["a", "b", "b", None],
+            }
+        ).to_sql("t", self.client, index=False)
+
+    def test_profile(self):
+        stats = self.client.profile("t")
+        self.assertEqual(list(stats.index), ["id", "amount", "name"])
+        self.assertEqual(
+            list(stats.columns),
+            ["count", "nulls", "null_fraction", "distinct", "min", "max", "mean"],
+        )
+
+        self.assertEqual(stats.loc["amount", "count"], 3)
+        self.assertEqual(stats.loc["amount", "nulls"], 1)
+        self.assertEqual(stats.loc["amount", "null_fraction"], 0.25)
+        self.assertEqual(stats.loc["amount", "min"], 1.0)
+        self.assertEqual(stats.loc["amount", "max"], 5.0)
+        self.assertEqual(stats.loc["amount", "mean"], 3.0)
+
+        self.assertEqual(stats.loc["name", "distinct"], 2)
+        self.assertEqual(stats.loc["name", "max"], "b")
+        self.assertTrue(pd.isnull(stats.loc["name", "mean"]))
+
+    def test_sample(self):
+        stats = self.client.profile("t", sample=0.5)
+        self.assertLessEqual(stats.loc["id", "count"], 4)
+
+    def test_no_distinct_counts(self):
+        stats = self.client.profile("t", distinct_counts=False)
+        self.assertNotIn("distinct", stats.columns)
+        self.assertEqual(stats.loc["name", "max"], "b")
+
+    def test_uuid(self):
+        self.client.execute("create table u (id integer, key char(36))")
+        self.client.execute(
+            "insert into u values (1, 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11')"
+        )
+        table = Table(
+            "u", MetaData(), Column("id", Integer), Column("key", UUID(as_uuid=True))
+        )
+        stats = self.client.profile(table)
+        self.assertEqual(stats.loc["key", "distinct"], 1)
+        self.assertTrue(pd.isnull(stats.loc["key", "min"]))
+        self.assertEqual(stats.loc["id", "min"], 1)
+
+    def test_from_n_distinct(self):
+        # negative values are a fraction of the rows, capped at the non-null count
+        self.assertEqual(_from_n_distinct(-0.5, 100, 100), 50)
+        self.assertEqual(_from_n_distinct(-1, 100, 90), 90)
+        self.assertEqual(_from_n_distinct(12, 100, 90), 12)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.routing`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_connectors.client import SqlClient
+
+
+class TestReplicaRouting(unittest.TestCase):
+    """Tests for a `SqlClient` with read replicas."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.urls = []
+        for name in ["primary", "replica1", "replica2"]:
+            url = "sqlite:///" + os.path.join(self.dir, name + ".sqlite")
+            setup = SqlClient(url)
+            setup.execute("create table t (id integer primary key, source text)")
+            setup.execute("insert into t (source) values ('{}')".format(name))
+            setup.dispose()
+            self.urls.append(url)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def client(self, replicas, **kwargs):
+        client = SqlClient(
+            self.urls[0], replicas=replicas, health_check_interval=None, **kwargs
+        )
+        self.addCleanup(client.dispose)
+        # wait for the health check that runs on startup
+        client.router._checker.join()
+        return client
+
+    def sources(self, engine):
+        return [r[0] for r in engine.execute("select source from t order by id")]
+
+    def test_reads_round_robin(self):
+        client = self.client(self.urls[1:])
+        sources = [client.read_sql("select source from t").source[0] for _ in range(4)]
+        self.assertEqual(
+            sorted(sources), ["replica1", "replica1", "replica2", "replica2"]
+        )
+
+    def test_writes_go_to_primary(self):
+        client = self.client(self.urls[1:2])
+        model = client.table_factory("t")
+
+        session = client.create_session()
+        session.bulk_persist([{"source": "written"}], mapper=model)
+        session.add(model(source="added"))
+        session.commit()
+        session.close()
+
+        self.assertEqual(self.sources(client), ["primary", "written", "added"])
+        self.assertEqual(self.sources(client.router.replicas[0]), ["replica1"])
+
+    def test_read_session_uses_replica(self):
+        client = self.client(self.urls[1:2])
+        model = client.table_factory("t")
+        with client.read_session() as session:
+            self.assertEqual([r.source for r in session.query(model)], ["replica1"])
+            self.assertFalse(hasattr(session, "bulk_persist"))
+
+    def test_unreachable_replica_at_startup(self):
+        missing = "sqlite:///" + os.path.join(self.dir, "missing", "db.sqlite")
+        client = self.client([missing] + self.urls[1:2])
+        self.assertEqual(client.router.healthy_replicas, client.router.replicas[1:])
+        for _ in range(3):
+            self.assertEqual(
+                client.read_sql("select source from t").source[0], "replica1"
+            )
+
+    def test_replica_lost_falls_back_to_primary(self):
+        replica_dir = os.path.join(self.dir, "replica")
+        os.makedirs(replica_dir)
+        shutil.copy(self.urls[1].split("///")[1], replica_dir)
+        client = self.client(
+            ["sqlite:///" + os.path.join(replica_dir, "replica1.sqlite")]
+        )
+        self.assertEqual(len(client.router.healthy_replicas), 1)
+
+        # take the replica away after the startup health check
+        client.router.replicas[0].dispose()
+        shutil.rmtree(replica_dir)
+
+        self.assertEqual(client.read_sql("select source from t").source[0], "primary")
+        self.assertEqual(client.router.healthy_replicas, [])
+
+    def test_latency_routing(self):
+        client = self.client(self.urls[1:], routing="latency")
+        self.assertTrue(all(client.router._latency))
+        sources = set(
+            client.read_sql("select source from t").source[0] for _ in range(20)
+        )
+        self.assertTrue(sources.issubset({"replica1", "replica2"}))
+
+    def test_dispose_stops_health_checks(self):
+        client = SqlClient(
+            self.urls[0], replicas=self.urls[1:], health_check_interval=60
+        )
+        checker = client.router._checker
+        self.assertTrue(checker.is_alive())
+        client.dispose()
+        checker.join(5)
+        self.assertFalse(checker.is_alive())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.slowlog`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_connectors.client import SqlClient
+from sql_connectors.slowlog import fingerprint, read_log, summarize
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    """Tests for `SqlClient.log_slow_queries`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "logs", "slow_queries.log")
+        self.client = SqlClient("sqlite:///" + os.path.join(self.dir, "db.sqlite"))
+        self.client.connection_name = "example"
+        self.client.env = "default"
+        self.client.execute("create table t (id integer primary key, name text)")
+        self.client.execute("insert into t values (1, 'a'), (2, 'b')")
+
+    def tearDown(self):
+        if self.client.slow_query_log is not None:
+            self.client.slow_query_log.close()
+        self.client.dispose()
+        shutil.rmtree(self.dir)
+
+    def test_records(self):
+        log = self.client.log_slow_queries(0, path=self.path)
+        self.client.read_sql("select * from t where id = 1")
+        self.client.read_sql("select * from t where id = 2")
+        log.close()
+        self.client.slow_query_log = None
+
+        records = read_log(self.path)
+        selects = records[records.statement.str.startswith("select")]
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(selects.fingerprint.nunique(), 1)
+
+        record = selects.iloc[0]
+        self.assertEqual(record.connection, "example")
+        self.assertEqual(record.env, "default")
+        self.assertEqual(record.dialect, "sqlite")
+        self.assertIsNotNone(record.fetch_s)
+        self.assertGreaterEqual(record.total_s, record.execute_s)
+        self.assertTrue(record.plan)
+
+        summary = summarize(self.path)
+        self.assertEqual(summary.loc[record.fingerprint, "count"], 2)
+
+    def test_threshold(self):
+        log = self.client.log_slow_queries(60, path=self.path)
+        self.client.read_sql("select * from t")
+        log.close()
+        self.client.slow_query_log = None
+        self.assertTrue(read_log(self.path).empty)
+
+    def test_shared_file(self):
+        other = SqlClient("sqlite://")
+        self.addCleanup(other.dispose)
+        first = self.client.log_slow_queries(0, path=self.path)
+        second = other.log_slow_queries(0, path=self.path)
+        self.assertIs(first.logger, second.logger)
+        self.assertEqual(len(first.logger.handlers), 1)
+
+        second.close()
+        self.client.read_sql("select 1 as x")
+        first.close()
+        self.client.slow_query_log = None
+        self.assertFalse(first.logger.handlers)
+        self.assertIn("select 1 as x", list(read_log(self.path).statement))
+
+    def test_fingerprint(self):
+        a = fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'")
+        b = fingerprint("select *  from t where id in (4) and name = 'yy' -- note")
+        self.assertEqual(a, b)
+        self.assertEqual(a[1], "select * from t where id in (?+) and name = ?")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.spill`."""
+
+import gc
+import os
+import unittest
+
+import pandas as pd
+
+from sql_connectors.client import SqlClient
+from sql_connectors.exceptions import SQLConnectorException
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestSpill(unittest.TestCase):
+    """Tests for `SqlClient.read_sql` with ``spill=True``."""
+
+    def setUp(self):
+        self.client = SqlClient("sqlite://")
+        pd.DataFrame(
+            {"id": range(1000), "amount": [i % 200 for i in range(1000)], "note": "x"}
+        ).to_sql("events", self.client, index=False)
+
+    def spill(self):
+        return self.client.read_sql("select * from events", spill=True, chunksize=300)
+
+    def test_read(self):
+        with self.spill() as events:
+            self.assertEqual(len(events), 1000)
+            self.assertEqual(events.columns, ["id", "amount", "note"])
+            self.assertEqual(len(list(events.iter_chunks())), 4)
+            pd.testing.assert_frame_equal(
+                events.to_pandas(), self.client.read_sql("select * from events")
+            )
+
+    def test_filter_and_select(self):
+        with self.spill() as events:
+            big = events.filter("amount >= 150").select(["id"])
+            df = big.to_pandas()
+            self.assertEqual(list(df.columns), ["id"])
+            self.assertEqual(len(df), 250)
+
+            by_function = events.select(["id"]).filter(
+                lambda d: d.amount >= 150, columns=["amount"]
+            )
+            self.assertEqual(len(by_function), 250)
+            self.assertEqual(len(events.head(7)), 7)
+
+    def test_close_deletes_files(self):
+        events = self.spill()
+        directory = events._store.directory
+        self.assertTrue(os.path.exists(directory))
+
+        events.close()
+        self.assertFalse(os.path.exists(directory))
+        self.assertTrue(events.closed)
+        with self.assertRaises(SQLConnectorException):
+            events.to_pandas()
+
+    def test_garbage_collection_deletes_files(self):
+        events = self.spill()
+        narrowed = events.select(["id"])
+        directory = events._store.directory
+
+        del events
+        gc.collect()
+        self.assertTrue(os.path.exists(directory))
+
+        del narrowed
+        gc.collect()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_null_chunks_keep_types(self):
+        # amount is null for the first and the last chunks
+        self.client.execute(
+            "update events set amount = null where id < 300 or id >= 900"
+        )
+        with self.spill() as events:
+            chunks = list(events.iter_chunks())
+            self.assertEqual(len(chunks), 4)
+            # all null chunks come back as numbers too, not as objects
+            self.assertEqual([c["amount"].dtype.kind for c in chunks], list("fiif"))
+            self.assertEqual(events.to_pandas()["amount"].count(), 600)
+
+        # selects from a table get their types from the columns instead of the data
+        table = self.client.get_table("events")
+        with self.client.read_sql(table.select(), spill=True, chunksize=300) as events:
+            self.assertEqual(len(events._store.files), 4)
+            self.assertEqual(events.to_pandas()["amount"].dtype, "float64")
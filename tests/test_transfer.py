@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sql_connectors.transfer`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_connectors.client import SqlClient
+from sql_connectors.exceptions import SQLConnectorException
+from sql_connectors.transfer import copy_table
+
+
+class Boom(Exception):
+    pass
+
+
+class TestCopyTable(unittest.TestCase):
+    """Tests for `copy_table`."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.src = SqlClient("sqlite:///" + os.path.join(self.dir, "src.sqlite"))
+        self.dst = SqlClient("sqlite:///" + os.path.join(self.dir, "dst.sqlite"))
+        self.src.execute("create table t (k text primary key, v integer)")
+        # mixed case keys sort differently with and without a case-insensitive
+        # collation, so resuming can't rely on the destination's max key
+        self.keys = ["{}{:04d}".format("aBcD"[i % 4], i) for i in range(1000)]
+        self.src.execute(
+            "insert into t values "
+            + ", ".join("('{}', {})".format(k, i) for i, k in enumerate(self.keys))
+        )
+
+    def tearDown(self):
+        self.src.dispose()
+        self.dst.dispose()
+        shutil.rmtree(self.dir)
+
+    def count(self, table="t"):
+        return self.dst.execute("select count(*) from {}".format(table)).scalar()
+
+    def test_copy(self):
+        result = copy_table(self.src, "t", self.dst, chunksize=100)
+        self.assertEqual(result.rows, 1000)
+        self.assertEqual(result.chunks, 10)
+        self.assertEqual(result.resumed, 0)
+        self.assertEqual(self.count(), 1000)
+
+    def test_resume_after_failure(self):
+        def fail_on_third_chunk(result):
+            if result.chunks == 3:
+                raise Boom()
+
+        with self.assertRaises(Boom):
+            copy_table(
+                self.src, "t", self.dst, chunksize=100, progress=fail_on_third_chunk
+            )
+        self.assertEqual(self.count(), 300)
+
+        result = copy_table(self.src, "t", self.dst, chunksize=100)
+        self.assertEqual(result.resumed, 300)
+        self.assertEqual(result.rows, 700)
+        self.assertEqual(
+            sorted(r[0] for r in self.dst.execute("select k from t")), sorted(self.keys)
+        )
+
+    def test_resume_copies_only_new_rows(self):
+        copy_table(self.src, "t", self.dst, chunksize=100)
+        self.src.execute("insert into t values ('zzzz', 1000)")
+        result = copy_table(self.src, "t", self.dst, chunksize=100)
+        self.assertEqual(result.rows, 1)
+        self.assertEqual(self.count(), 1001)
+
+    def test_refuses_unrelated_rows(self):
+        self.dst.execute("create table t (k text primary key, v integer)")
+        self.dst.execute("insert into t values ('other', 0)")
+        with self.assertRaises(SQLConnectorException):
+            copy_table(self.src, "t", self.dst)
+
+        result = copy_table(self.src, "t", self.dst, resume=False)
+        self.assertEqual(result.rows, 1000)
+        self.assertEqual(self.count(), 1000)